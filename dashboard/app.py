@@ -12,37 +12,20 @@ This module initializes and runs the Streamlit dashboard application.
 
 
 
-import os
 import pandas as pd
 import streamlit as st
-from sqlalchemy import create_engine, text
+
+from data_access import Filters, get_shortage_data
+from pagination import DRILL_COLUMNS
 
 # Page setup 
 st.set_page_config(page_title="FDA Shortage Dashboard", layout="wide")
 st.title("FDA Drug Shortage Monitoring Dashboard")
 st.caption("Interactive dashboard for FDA drug shortages")
 
-DB_USER = os.getenv("DB_USER", "root")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST", "127.0.0.1")
-DB_PORT = os.getenv("DB_PORT", "3306")
-DB_NAME = os.getenv("DB_NAME", "fda_shortage_db")
-
-if not DB_PASSWORD:
-    st.error("DB_PASSWORD is not set")
-    st.stop()
-
-@st.cache_resource
-def get_engine():
-    return create_engine(
-        f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
-        pool_pre_ping=True,
-    )
-
-engine = get_engine()
-
-def q(sql, params=None):
-    return pd.read_sql(text(sql), engine, params=params or {})
+# Shared engine, cache and snapshot (see data_access.py)
+data = get_shortage_data()
+data.sync()
 
 
 # Sidebar filters
@@ -50,60 +33,34 @@ def q(sql, params=None):
 st.sidebar.header("Filters")
 only_current = st.sidebar.checkbox("Only current shortages", True)
 
-@st.cache_data
-def filter_lists():
-    return (
-        q("SELECT DISTINCT company_name FROM shortages_with_ndc WHERE company_name IS NOT NULL ORDER BY 1")["company_name"].tolist(),
-        q("SELECT DISTINCT route FROM shortages_with_ndc WHERE route IS NOT NULL ORDER BY 1")["route"].tolist(),
-        q("SELECT DISTINCT shortage_dosage_form FROM shortages_with_ndc WHERE shortage_dosage_form IS NOT NULL ORDER BY 1")["shortage_dosage_form"].tolist(),
-        q("SELECT DISTINCT therapeutic_category FROM shortages_with_ndc WHERE therapeutic_category IS NOT NULL ORDER BY 1")["therapeutic_category"].tolist(),
-    )
+options = data.filter_options()
+
+mfg = st.sidebar.selectbox("Manufacturer", ["All"] + options["manufacturers"])
+route = st.sidebar.selectbox("Route", ["All"] + options["routes"])
+dose = st.sidebar.selectbox("Dosage form", ["All"] + options["dosage_forms"])
+ther = st.sidebar.selectbox("Therapeutic category", ["All"] + options["therapeutic_categories"])
+page_size = st.sidebar.slider("Detail rows per page", 25, 200, 50, 25)
+st.sidebar.caption(data.status())
+
+filters = Filters(
+    only_current=only_current,
+    company_name=None if mfg == "All" else mfg,
+    route=None if route == "All" else route,
+    dosage_form=None if dose == "All" else dose,
+    therapeutic_category=None if ther == "All" else ther,
+)
+
+
+# KPIs (with the filters applied), brand and package breakdowns: one scan
 
-manufacturers, routes, dosages, therapeutics = filter_lists()
-
-mfg = st.sidebar.selectbox("Manufacturer", ["All"] + manufacturers)
-route = st.sidebar.selectbox("Route", ["All"] + routes)
-dose = st.sidebar.selectbox("Dosage form", ["All"] + dosages)
-ther = st.sidebar.selectbox("Therapeutic category", ["All"] + therapeutics)
-limit_rows = st.sidebar.slider("Detail rows", 50, 1000, 200, 50)
-
-filters, params = [], {}
-if only_current:
-    filters.append("status='Current'")
-if mfg != "All":
-    filters.append("company_name=:mfg")
-    params["mfg"] = mfg
-if route != "All":
-    filters.append("route=:route")
-    params["route"] = route
-if dose != "All":
-    filters.append("shortage_dosage_form=:dose")
-    params["dose"] = dose
-if ther != "All":
-    filters.append("therapeutic_category=:ther")
-    params["ther"] = ther
-
-where = "WHERE " + " AND ".join(filters) if filters else ""
-
-
-# KPIs
-
-kpi = q(
-    """
-    SELECT
-      COUNT(*) total,
-      SUM(status='Current') current,
-      COUNT(DISTINCT company_name) manufacturers,
-      COUNT(DISTINCT package_ndc) packages
-    FROM shortages_with_ndc;
-    """
-).iloc[0]
+summary = data.summary(filters)
+kpi = summary["kpis"]
 
 c1, c2, c3, c4 = st.columns(4)
-c1.metric("Total shortages", f"{int(kpi.total):,}")
-c2.metric("Current shortages", f"{int(kpi.current):,}")
-c3.metric("Manufacturers", f"{int(kpi.manufacturers):,}")
-c4.metric("Packages affected", f"{int(kpi.packages):,}")
+c1.metric("Total shortages", f"{int(kpi.total_shortages):,}")
+c2.metric("Current shortages", f"{int(kpi.current_shortages):,}")
+c3.metric("Manufacturers", f"{int(kpi.affected_manufacturers):,}")
+c4.metric("Packages affected", f"{int(kpi.affected_packages):,}")
 
 st.divider()
 
@@ -112,16 +69,7 @@ st.divider()
 
 st.subheader("1) Manufacturer Impact Analysis")
 
-df_manu = q(
-    """
-    SELECT company_name,
-           current_affected_packages,
-           current_affected_products
-    FROM current_manufacturer_risk
-    ORDER BY current_affected_packages DESC
-    LIMIT 25;
-    """
-)
+df_manu = data.manufacturer_risk(limit=25)
 
 c1, c2 = st.columns([2, 1])
 c1.dataframe(df_manu, use_container_width=True)
@@ -134,22 +82,7 @@ st.divider()
 
 st.subheader("2) Branded vs Generic Shortage Duration(use filter)")
 
-df_brand = q(
-    f"""
-    SELECT
-      CASE
-        WHEN brand_name IS NOT NULL AND brand_name<>'' THEN 'Branded'
-        ELSE 'Generic/Unbranded'
-      END drug_type,
-      COUNT(*) shortage_count,
-      ROUND(AVG(DATEDIFF(CURDATE(),initial_posting_date_dt)),1) AS avg_days_active
-    FROM shortages_with_ndc
-    {where}
-    AND initial_posting_date_dt IS NOT NULL
-    GROUP BY drug_type;
-    """,
-    params,
-)
+df_brand = summary["brand"]
 
 c1, c2 = st.columns([2, 1])
 c1.dataframe(df_brand, use_container_width=True)
@@ -163,25 +96,7 @@ st.divider()
 
 st.subheader("3) Packaging Types Most Affected(use filter)")
 
-df_pkg = q(
-    f"""
-    SELECT
-      CASE
-        WHEN LOWER(package_description) LIKE '%bottle%' THEN 'Bottle'
-        WHEN LOWER(package_description) LIKE '%vial%' THEN 'Vial'
-        WHEN LOWER(package_description) LIKE '%blister%' THEN 'Blister'
-        WHEN LOWER(package_description) LIKE '%carton%' THEN 'Carton'
-        ELSE 'Other'
-      END package_type,
-      COUNT(*) shortage_count
-    FROM shortages_with_ndc
-    {where}
-    AND package_description IS NOT NULL
-    GROUP BY package_type
-    ORDER BY shortage_count DESC;
-    """,
-    params,
-)
+df_pkg = summary["packages"]
 
 c1, c2 = st.columns([2, 1])
 c1.dataframe(df_pkg, use_container_width=True)
@@ -196,51 +111,45 @@ st.subheader("Detailed Shortage Records")
 
 mode = st.selectbox(
     "Drill by",
-    ["Manufacturer", "Generic Name", "Package NDC"],
+    list(DRILL_COLUMNS),
 )
+column = DRILL_COLUMNS[mode]
 
-if mode == "Manufacturer":
-    val = st.selectbox("Select", manufacturers)
-    df = q(
-        f"""
-        SELECT * FROM shortages_with_ndc
-        WHERE company_name=:v
-        ORDER BY update_date DESC
-        LIMIT {limit_rows};
-        """,
-        {"v": val},
-    )
-
-elif mode == "Generic Name":
-    names = q(
-        "SELECT DISTINCT ndc_generic_name FROM shortages_with_ndc WHERE ndc_generic_name IS NOT NULL ORDER BY 1"
-    )["ndc_generic_name"].tolist()
-    val = st.selectbox("Select", names)
-    df = q(
-        f"""
-        SELECT * FROM shortages_with_ndc
-        WHERE ndc_generic_name=:v
-        ORDER BY update_date DESC
-        LIMIT {limit_rows};
-        """,
-        {"v": val},
-    )
+# typeahead: only values starting with the search text are fetched
+search = st.text_input(f"Search {mode.lower()} (starts with)", "")
+matches = data.drill_values(column, search)
 
+if not matches:
+    st.info("No matching values")
 else:
-    pkgs = q(
-        "SELECT DISTINCT package_ndc FROM shortages_with_ndc WHERE package_ndc IS NOT NULL ORDER BY 1"
-    )["package_ndc"].tolist()
-    val = st.selectbox("Select", pkgs)
-    df = q(
-        f"""
-        SELECT * FROM shortages_with_ndc
-        WHERE package_ndc=:v
-        ORDER BY update_date DESC
-        LIMIT {limit_rows};
-        """,
-        {"v": val},
+    val = st.selectbox("Select", matches)
+
+    # keyset pagination: the cursor stack lives in the session, reset on a new selection
+    page_key = (mode, val, page_size)
+    if st.session_state.get("page_key") != page_key:
+        st.session_state["page_key"] = page_key
+        st.session_state["cursors"] = [None]
+    cursors = st.session_state["cursors"]
+
+    df, has_next = data.drill_page(column, val, cursors[-1], page_size)
+
+    c1, c2, c3 = st.columns([1, 1, 4])
+    if c1.button("◀ Previous", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if c2.button("Next ▶", disabled=not has_next):
+        last = df.iloc[-1]
+        last_date = None if pd.isna(last["update_date_dt"]) else pd.Timestamp(last["update_date_dt"]).date()
+        cursors.append((last_date, int(last["shortage_id"])))
+        st.rerun()
+    c3.caption(f"Page {len(cursors)}")
+
+    st.dataframe(df, use_container_width=True)
+
+with st.expander("Query timings"):
+    pool = data.engine.pool
+    st.caption(
+        f"Pool: {pool.checkedout()} checked out, {pool.checkedin()} idle, "
+        f"{data.engine.connections_opened} connections opened since start"
     )
-
-st.dataframe(df, use_container_width=True)
-
-engine.dispose()
+    st.dataframe(data.stats.frame().iloc[::-1], use_container_width=True)
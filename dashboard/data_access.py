@@ -0,0 +1,311 @@
+"""
+Shared data access for both Streamlit dashboards (dashboard/app.py and
+scripts/dashboard.py).
+
+One ShortageData per process holds the pooled engine, the query timings, the
+result cache and the in-memory snapshot. Every query goes through the same
+policy: answered from the snapshot when enabled, otherwise from the result
+cache, and both are invalidated when pipeline_version changes. The typed
+query functions below are the only SQL the dashboards run.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+import streamlit as st
+
+from db import QueryStats, create_pooled_engine
+from pagination import keyset_page, prefix_lookup
+from query_cache import QueryCache
+from snapshot import AnalyticsSnapshot, snapshot_enabled
+
+# Sidebar filter lists: option key -> column
+FILTER_COLUMNS = {
+    "manufacturers": "company_name",
+    "routes": "route",
+    "dosage_forms": "shortage_dosage_form",
+    "therapeutic_categories": "therapeutic_category",
+}
+
+
+@dataclass(frozen=True)
+class Filters:
+    """Sidebar selections; None means no filter on that column."""
+    only_current: bool = False
+    company_name: str | None = None
+    route: str | None = None
+    dosage_form: str | None = None
+    therapeutic_category: str | None = None
+
+    def where(self, *conditions: str) -> tuple[str, dict]:
+        """WHERE clause (possibly empty) for these filters plus extra conditions."""
+        clauses, params = [], {}
+        if self.only_current:
+            clauses.append("status = 'Current'")
+        for column, key, value in [
+            ("company_name", "mfg", self.company_name),
+            ("route", "route", self.route),
+            ("shortage_dosage_form", "dose", self.dosage_form),
+            ("therapeutic_category", "ther", self.therapeutic_category),
+        ]:
+            if value is not None:
+                clauses.append(f"{column} = :{key}")
+                params[key] = value
+        clauses += conditions
+        return ("WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+class ShortageData:
+    """Engine, cache and snapshot behind the dashboards, plus their queries."""
+
+    def __init__(self, engine, use_snapshot: bool | None = None):
+        self.engine = engine
+        self.stats = QueryStats()
+        self.cache = QueryCache(maxsize=int(os.getenv("DASHBOARD_CACHE_SIZE", "256")))
+        self.use_snapshot = snapshot_enabled() if use_snapshot is None else use_snapshot
+        self.snapshot = AnalyticsSnapshot() if self.use_snapshot else None
+
+    # ---- cache policy ----
+
+    def run_mysql(self, sql: str, params: dict | None = None) -> pd.DataFrame:
+        return self.stats.run(self.engine, sql, params)
+
+    def pipeline_version(self):
+        try:
+            return self.run_mysql("SELECT version FROM pipeline_version WHERE id = 1")["version"].iloc[0]
+        except Exception:
+            return None  # table missing or empty: keep results until the app restarts
+
+    def sync(self) -> None:
+        """Call once per rerun: pick up a new pipeline version if there is one."""
+        self.cache.sync_version(self.pipeline_version)
+        if self.snapshot is not None:
+            self.snapshot.sync(self.cache.version, lambda name: self.run_mysql(f"SELECT * FROM {name}"))
+
+    def refresh(self) -> None:
+        """Drop cached results and the snapshot so the next sync reloads everything."""
+        self.cache.clear()
+        if self.snapshot is not None:
+            self.snapshot.invalidate()
+
+    def query(self, sql: str, params: dict | None = None) -> pd.DataFrame:
+        if self.snapshot is not None:
+            start = time.perf_counter()
+            df = self.snapshot.query(sql, params)
+            self.stats.record("duckdb", sql, 0.0, time.perf_counter() - start, len(df))
+            return df
+        return self.cache.get_or_run(sql, params, lambda: self.run_mysql(sql, params))
+
+    def status(self) -> str:
+        """One-line description of where results come from, for the sidebar."""
+        if self.snapshot is not None:
+            return (
+                f"In-memory snapshot: {self.snapshot.rows.get('shortages_with_ndc', 0):,} rows, "
+                f"loaded {self.snapshot.loaded_at:%Y-%m-%d %H:%M:%S} in {self.snapshot.load_seconds}s "
+                f"(pipeline version {self.snapshot.version})"
+            )
+        return (
+            f"Query cache: {len(self.cache)} results, {self.cache.hits} hits / {self.cache.misses} misses "
+            f"(pipeline version {self.cache.version})"
+        )
+
+    # ---- queries ----
+
+    def filter_options(self) -> dict[str, list[str]]:
+        """Distinct values for every sidebar filter, in one round trip."""
+        sql = " UNION ALL ".join(
+            f"SELECT DISTINCT '{key}' AS field, {column} AS value "
+            f"FROM shortages_with_ndc WHERE {column} IS NOT NULL"
+            for key, column in FILTER_COLUMNS.items()
+        )
+        df = self.query(sql).sort_values("value")
+        return {key: df.loc[df["field"] == key, "value"].tolist() for key in FILTER_COLUMNS}
+
+    def overview(self) -> pd.Series:
+        """All KPI counts over the whole table, in one round trip."""
+        return self.query(
+            """
+            SELECT
+              COUNT(*) AS total_shortages,
+              SUM(CASE WHEN status = 'Current' THEN 1 ELSE 0 END) AS current_shortages,
+              COUNT(DISTINCT company_name) AS affected_manufacturers,
+              COUNT(DISTINCT product_ndc) AS affected_products,
+              COUNT(DISTINCT package_ndc) AS affected_packages
+            FROM shortages_with_ndc
+            """
+        ).iloc[0]
+
+    def summary(self, filters: Filters) -> dict[str, pd.Series | pd.DataFrame]:
+        """
+        KPIs, brand vs generic and package type breakdown for filters, from
+        one scan: GROUP BY drug_type, package_type WITH ROLLUP gives the
+        (drug_type, package_type) cells, the per-drug_type rows and the
+        grand total, told apart with GROUPING(). Package counts are summed
+        from the cells. Returns {"kpis", "brand", "packages"}.
+        """
+        where, params = filters.where()
+        df = self.query(
+            f"""
+            SELECT
+              GROUPING(drug_type) AS all_drug_types,
+              GROUPING(package_type) AS all_package_types,
+              drug_type,
+              package_type,
+              COUNT(*) AS shortage_count,
+              SUM(is_current) AS current_shortages,
+              ROUND(AVG(days_active), 1) AS avg_days_active,
+              COUNT(DISTINCT company_name) AS affected_manufacturers,
+              COUNT(DISTINCT product_ndc) AS affected_products,
+              COUNT(DISTINCT package_ndc) AS affected_packages
+            FROM (
+              SELECT
+                CASE
+                  WHEN brand_name IS NOT NULL AND brand_name <> '' THEN 'Branded'
+                  ELSE 'Generic/Unbranded'
+                END AS drug_type,
+                package_type,
+                CASE WHEN status = 'Current' THEN 1 ELSE 0 END AS is_current,
+                DATEDIFF(CURDATE(), initial_posting_date_dt) AS days_active,
+                company_name,
+                product_ndc,
+                package_ndc
+              FROM shortages_with_ndc
+              {where}
+            ) filtered
+            GROUP BY drug_type, package_type WITH ROLLUP
+            """,
+            params,
+        )
+
+        total = df[(df["all_drug_types"] == 1) & (df["all_package_types"] == 1)]
+        kpi_columns = ["shortage_count", "current_shortages", "affected_manufacturers",
+                       "affected_products", "affected_packages"]
+        kpis = (total[kpi_columns].iloc[0] if not total.empty else pd.Series(0, index=kpi_columns)).fillna(0)
+        kpis = kpis.rename({"shortage_count": "total_shortages"})
+
+        brand = df[(df["all_drug_types"] == 0) & (df["all_package_types"] == 1)]
+        brand = brand[["drug_type", "shortage_count", "avg_days_active"]].reset_index(drop=True)
+
+        cells = df[(df["all_drug_types"] == 0) & (df["all_package_types"] == 0) & df["package_type"].notna()]
+        packages = (
+            cells.groupby("package_type", as_index=False)["shortage_count"].sum()
+            .sort_values("shortage_count", ascending=False, ignore_index=True)
+        )
+        return {"kpis": kpis, "brand": brand, "packages": packages}
+
+    def manufacturer_risk(self, limit: int = 25) -> pd.DataFrame:
+        """Manufacturers with the most packages currently in shortage."""
+        return self.query(
+            f"""
+            SELECT company_name,
+                   current_affected_packages,
+                   current_affected_products
+            FROM current_manufacturer_risk
+            ORDER BY current_affected_packages DESC
+            LIMIT {int(limit)}
+            """
+        )
+
+    def brand_vs_generic(self, filters: Filters) -> pd.DataFrame:
+        """Shortage count and average days active for branded vs generic drugs."""
+        where, params = filters.where()
+        return self.query(
+            f"""
+            SELECT
+              CASE
+                WHEN brand_name IS NOT NULL AND brand_name <> '' THEN 'Branded'
+                ELSE 'Generic/Unbranded'
+              END AS drug_type,
+              COUNT(*) AS shortage_count,
+              ROUND(AVG(DATEDIFF(CURDATE(), initial_posting_date_dt)), 1) AS avg_days_active
+            FROM shortages_with_ndc
+            {where}
+            GROUP BY drug_type
+            """,
+            params,
+        )
+
+    def route_groups(self, filters: Filters, limit: int = 10) -> pd.DataFrame:
+        where, params = filters.where("route_group IS NOT NULL")
+        return self.query(
+            f"""
+            SELECT route_group AS administration_route, COUNT(*) AS shortage_count
+            FROM shortages_with_ndc
+            {where}
+            GROUP BY route_group
+            ORDER BY shortage_count DESC
+            LIMIT {int(limit)}
+            """,
+            params,
+        )
+
+    def product_types(self, filters: Filters) -> pd.DataFrame:
+        where, params = filters.where("product_type IS NOT NULL")
+        return self.query(
+            f"""
+            SELECT product_type,
+                   COUNT(*) AS shortage_count,
+                   COUNT(DISTINCT company_name) AS manufacturers
+            FROM shortages_with_ndc
+            {where}
+            GROUP BY product_type
+            ORDER BY shortage_count DESC
+            """,
+            params,
+        )
+
+    def longest_active(self, filters: Filters, limit: int = 50) -> pd.DataFrame:
+        """Matched shortages that have been posted the longest."""
+        where, params = filters.where("product_ndc IS NOT NULL")
+        return self.query(
+            f"""
+            SELECT
+              company_name AS manufacturer,
+              shortage_generic_name AS drug_name,
+              brand_name,
+              shortage_dosage_form AS dosage_form,
+              package_description,
+              product_type,
+              DATEDIFF(CURDATE(), initial_posting_date_dt) AS days_active
+            FROM shortages_with_ndc
+            {where}
+            ORDER BY days_active DESC
+            LIMIT {int(limit)}
+            """,
+            params,
+        )
+
+    def drill_values(self, column: str, text: str) -> list[str]:
+        """Values of a drill-down column starting with text."""
+        return self.query(*prefix_lookup(column, text))["value"].tolist()
+
+    def drill_page(self, column: str, value, cursor: tuple | None, page_size: int) -> tuple[pd.DataFrame, bool]:
+        """One keyset page of rows where column = value, and whether another page follows."""
+        df = self.query(*keyset_page(column, value, cursor, page_size))
+        return df.head(page_size), len(df) > page_size
+
+
+def get_shortage_data() -> ShortageData:
+    """
+    The process-wide ShortageData, built from DB_* environment variables.
+    Stops the app with an error when DB_PASSWORD is not set.
+    """
+    password = os.getenv("DB_PASSWORD")
+    if not password:
+        st.error("DB_PASSWORD is not set")
+        st.stop()
+    return _shared_data(
+        os.getenv("DB_USER", "root"),
+        password,
+        os.getenv("DB_HOST", "127.0.0.1"),
+        os.getenv("DB_PORT", "3306"),
+        os.getenv("DB_NAME", "fda_shortage_db"),
+    )
+
+
+# One pooled engine, cache and snapshot for the whole process (all sessions)
+@st.cache_resource
+def _shared_data(user: str, password: str, host: str, port: str, db: str) -> ShortageData:
+    return ShortageData(create_pooled_engine(user, password, host, port, db))
@@ -0,0 +1,76 @@
+"""
+Database access for the Streamlit dashboard: one pooled engine per process
+(shared by every session) and per-query timing.
+
+Pool settings come from environment variables:
+    DASHBOARD_POOL_SIZE      connections kept open (default 10)
+    DASHBOARD_MAX_OVERFLOW   extra connections under load (default 20)
+    DASHBOARD_POOL_RECYCLE   seconds before a connection is replaced (default 1800)
+    DASHBOARD_POOL_TIMEOUT   seconds to wait for a free connection (default 30)
+    DASHBOARD_POOL_PRE_PING  1 to ping before every checkout (default 0; recycle
+                             already replaces connections before MySQL's wait_timeout)
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+from sqlalchemy import create_engine, event, text
+
+
+def env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def create_pooled_engine(user: str, password: str, host: str, port: str, db: str):
+    """Create the shared engine and count physical connections it opens."""
+    engine = create_engine(
+        f"mysql+mysqlconnector://{user}:{password}@{host}:{port}/{db}",
+        pool_size=env_int("DASHBOARD_POOL_SIZE", 10),
+        max_overflow=env_int("DASHBOARD_MAX_OVERFLOW", 20),
+        pool_recycle=env_int("DASHBOARD_POOL_RECYCLE", 1800),
+        pool_timeout=env_int("DASHBOARD_POOL_TIMEOUT", 30),
+        pool_pre_ping=os.getenv("DASHBOARD_POOL_PRE_PING", "0") == "1",
+    )
+    engine.connections_opened = 0
+
+    @event.listens_for(engine, "connect")
+    def _count_connect(dbapi_connection, connection_record):
+        engine.connections_opened += 1
+
+    return engine
+
+
+class QueryStats:
+    """Recent query timings, split into pool checkout and query execution."""
+
+    def __init__(self, keep: int = 200):
+        self._records: deque = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def run(self, engine, sql: str, params: dict | None = None) -> pd.DataFrame:
+        """Run a query on a pooled connection and record how long each part took."""
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            checkout = time.perf_counter()
+            df = pd.read_sql(text(sql), conn, params=params or {})
+        done = time.perf_counter()
+
+        self.record("mysql", sql, checkout - start, done - checkout, len(df))
+        return df
+
+    def record(self, source: str, sql: str, checkout_s: float, query_s: float, rows: int) -> None:
+        with self._lock:
+            self._records.append({
+                "source": source,
+                "query": " ".join(sql.split())[:80],
+                "checkout_ms": round(checkout_s * 1000, 1),
+                "query_ms": round(query_s * 1000, 1),
+                "rows": rows,
+            })
+
+    def frame(self) -> pd.DataFrame:
+        with self._lock:
+            return pd.DataFrame(list(self._records), columns=["source", "query", "checkout_ms", "query_ms", "rows"])
@@ -0,0 +1,80 @@
+"""
+Keyset pagination and prefix lookups for the drill-down section.
+
+Pages are ordered by (update_date_dt DESC, shortage_id DESC) and each page
+starts after the last row of the previous one, so the database reads only
+one page of index entries no matter how deep the user pages. Rows without
+an update date come after all dated rows.
+"""
+
+# Columns shown in the drill-down (instead of SELECT *)
+DETAIL_COLUMNS = [
+    "shortage_id",
+    "update_date_dt",
+    "initial_posting_date_dt",
+    "status",
+    "company_name",
+    "shortage_generic_name",
+    "brand_name",
+    "package_ndc",
+    "package_description",
+    "package_type",
+    "route_group",
+    "therapeutic_category",
+]
+
+# Drill-down choices -> indexed column they filter on (see 02_transformations.sql)
+DRILL_COLUMNS = {
+    "Manufacturer": "company_name",
+    "Generic Name": "ndc_generic_key",
+    "Package NDC": "package_ndc",
+}
+
+
+def keyset_page(column: str, value, cursor: tuple | None, page_size: int) -> tuple[str, dict]:
+    """
+    SQL and params for one page of rows where `column` = value.
+    cursor is (update_date_dt, shortage_id) of the last row already shown,
+    or None for the first page. One extra row is fetched to tell whether
+    another page exists.
+    """
+    params = {"v": value}
+    after = ""
+    if cursor is not None:
+        last_date, last_id = cursor
+        params["last_id"] = int(last_id)
+        if last_date is None:
+            after = "AND update_date_dt IS NULL AND shortage_id < :last_id"
+        else:
+            params["last_date"] = last_date
+            after = """AND (update_date_dt < :last_date
+                 OR (update_date_dt = :last_date AND shortage_id < :last_id)
+                 OR update_date_dt IS NULL)"""
+
+    sql = f"""
+        SELECT {", ".join(DETAIL_COLUMNS)}
+        FROM shortages_with_ndc
+        WHERE {column} = :v
+        {after}
+        ORDER BY update_date_dt DESC, shortage_id DESC
+        LIMIT {int(page_size) + 1}
+    """
+    return sql, params
+
+
+def like_prefix(text: str) -> str:
+    """LIKE pattern matching values that start with text (wildcards escaped with '!')."""
+    escaped = text.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+    return escaped + "%"
+
+
+def prefix_lookup(column: str, text: str, limit: int = 50) -> tuple[str, dict]:
+    """Distinct values of an indexed column starting with text (index range scan)."""
+    sql = f"""
+        SELECT DISTINCT {column} AS value
+        FROM shortages_with_ndc
+        WHERE {column} LIKE :prefix ESCAPE '!'
+        ORDER BY {column}
+        LIMIT {int(limit)}
+    """
+    return sql, {"prefix": like_prefix(text.strip())}
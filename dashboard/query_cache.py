@@ -0,0 +1,91 @@
+"""
+Query result cache for the Streamlit dashboard.
+
+Results are kept in a bounded LRU keyed on the normalized SQL text plus
+its parameters. Normalizing collapses whitespace outside quoted literals
+and identifiers; text inside quotes is kept as written. The whole cache
+is dropped when the pipeline run version (the row the loader writes to
+pipeline_version) changes, so a new load is visible on the next rerun
+without waiting for a TTL.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+# Quoted literals/identifiers (kept as written) or a run of whitespace (collapsed)
+SQL_TOKEN_RE = re.compile(r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`|\s+""")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Collapse whitespace outside quoted strings and drop a trailing ';', so
+    formatting does not change the key but a string value always does.
+    """
+    collapsed = SQL_TOKEN_RE.sub(lambda m: " " if m.group(0).isspace() else m.group(0), sql)
+    return collapsed.strip().rstrip(";").strip()
+
+
+class QueryCache:
+    """Thread-safe LRU of DataFrames, invalidated on pipeline version changes."""
+
+    def __init__(self, maxsize: int = 256, version_ttl: float = 5.0):
+        self.maxsize = maxsize
+        self.version_ttl = version_ttl  # seconds between pipeline version lookups
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(sql: str, params: dict | None) -> tuple:
+        return normalize_sql(sql), tuple(sorted((params or {}).items()))
+
+    def sync_version(self, fetch_version) -> None:
+        """
+        Look up the pipeline version (at most every version_ttl seconds) and
+        clear the cache if it moved since the last lookup.
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self.version_ttl:
+            return
+        version = fetch_version()
+        with self._lock:
+            self._checked_at = now
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+
+    def clear(self) -> None:
+        """Drop every cached result and look the version up again on the next sync."""
+        with self._lock:
+            self._entries.clear()
+            self._checked_at = 0.0
+
+    def get_or_run(self, sql: str, params: dict | None, run) -> pd.DataFrame:
+        """Return the cached result for (sql, params) or call run() and cache it."""
+        key = self.make_key(sql, params)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key].copy()
+            self.misses += 1
+
+        df = run()
+
+        with self._lock:
+            self._entries[key] = df
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return df.copy()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,112 @@
+"""
+In-memory analytics snapshot for the Streamlit dashboard.
+
+The tables the dashboard reads are copied from MySQL into an in-process
+DuckDB database (via Arrow) and every chart, filter list and drill-down page
+is answered from that copy. The copy is rebuilt when the pipeline run version
+changes; MySQL stays the system of record, and the dashboard falls back to it
+when duckdb is not installed or DASHBOARD_BACKEND=mysql.
+"""
+
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+
+# Tables copied into the snapshot (everything the dashboard queries)
+SNAPSHOT_TABLES = ["shortages_with_ndc", "current_manufacturer_risk"]
+
+# MySQL functions used by the dashboard queries, defined for DuckDB
+MYSQL_MACROS = [
+    "CREATE MACRO curdate() AS current_date",
+    "CREATE MACRO datediff(a, b) AS date_diff('day', b, a)",
+]
+
+PARAM_RE = re.compile(r"(?<![:\w]):(\w+)")
+ROLLUP_RE = re.compile(r"GROUP BY\s+(.+?)\s+WITH ROLLUP", re.IGNORECASE | re.DOTALL)
+
+
+def duckdb_available() -> bool:
+    """True when duckdb is installed."""
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def snapshot_enabled() -> bool:
+    """Use the snapshot unless DASHBOARD_BACKEND=mysql or duckdb is missing."""
+    return os.getenv("DASHBOARD_BACKEND", "duckdb").lower() == "duckdb" and duckdb_available()
+
+
+def to_duckdb_sql(sql: str) -> str:
+    """Rewrite ':name' parameters to '$name' and MySQL's 'GROUP BY ... WITH ROLLUP' to 'GROUP BY ROLLUP (...)'."""
+    sql = ROLLUP_RE.sub(r"GROUP BY ROLLUP (\1)", sql)
+    return PARAM_RE.sub(r"$\1", sql).strip().rstrip(";")
+
+
+class AnalyticsSnapshot:
+    """DuckDB copy of SNAPSHOT_TABLES, swapped in whole when the pipeline version moves."""
+
+    def __init__(self, tables: list[str] = SNAPSHOT_TABLES):
+        self.tables = tables
+        self.version = None
+        self.loaded_at = None
+        self.load_seconds = None
+        self.rows = {}
+        self._con = None
+        self._stale = False
+        self._refresh_lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Rebuild on the next sync even if the pipeline version has not moved."""
+        self._stale = True
+
+    def sync(self, version, read_table) -> None:
+        """
+        Rebuild the snapshot if version differs from the one it was built at.
+        read_table(name) returns the MySQL table as a DataFrame. Sessions that
+        arrive while another one is rebuilding keep reading the old copy.
+        """
+        if self._con is not None and version == self.version and not self._stale:
+            return
+        if not self._refresh_lock.acquire(blocking=self._con is None):
+            return
+        try:
+            if self._con is not None and version == self.version and not self._stale:
+                return  # another session finished the rebuild first
+            start = time.perf_counter()
+            con, rows = self._build(read_table)
+            self._con, self.rows, self.version = con, rows, version
+            self._stale = False
+            self.load_seconds = round(time.perf_counter() - start, 2)
+            self.loaded_at = pd.Timestamp.now()
+        finally:
+            self._refresh_lock.release()
+
+    def _build(self, read_table):
+        import duckdb
+        import pyarrow as pa
+
+        con = duckdb.connect(database=":memory:")
+        for macro in MYSQL_MACROS:
+            con.execute(macro)
+        rows = {}
+        for name in self.tables:
+            arrow_table = pa.Table.from_pandas(read_table(name), preserve_index=False)
+            con.register("incoming", arrow_table)
+            con.execute(f"CREATE TABLE {name} AS SELECT * FROM incoming")
+            con.unregister("incoming")
+            rows[name] = arrow_table.num_rows
+        return con, rows
+
+    def query(self, sql: str, params: dict | None = None) -> pd.DataFrame:
+        """Run a dashboard query (MySQL dialect, ':name' params) against the snapshot."""
+        cursor = self._con.cursor()  # one cursor per call: DuckDB connections are not shared across threads
+        try:
+            return cursor.execute(to_duckdb_sql(sql), params or {}).df()
+        finally:
+            cursor.close()
@@ -0,0 +1,206 @@
+#Declarative registry of the monitoring checks run by run_monitoring.py.
+#Each check names a statement in one of the SQL files ("-- name: <id>" marker)
+#and says how bad a failure is, what result is expected, how long it may run,
+#how expensive it is and which tables it reads.
+
+
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+NAME_RE = re.compile(r"^--\s*name:\s*(\w+)\s*$")
+
+SCHEMA_SQL = "monitoring/schema_snapshot.sql"
+HEALTH_SQL = "monitoring/pipeline_health.sql"
+QUALITY_SQL = "monitoring/data_quality_checks.sql"
+ANALYSIS_SQL = "sql/03_analysis_queries.sql"
+
+# Tables rebuilt from others: a change to the key also changes the values
+DERIVED_TABLES = {
+    "raw_ndc": ["shortages_with_ndc"],
+    "raw_ndc_packaging": ["shortages_with_ndc"],
+    "raw_drug_shortages": ["shortages_with_ndc"],
+    "shortages_with_ndc": ["current_manufacturer_risk", "multi_package_shortages"],
+}
+
+
+# ---- expected-result assertions: return None when fine, else a message ----
+
+def totals(df: pd.DataFrame) -> pd.DataFrame:
+    """The totals row of a profile (is_total = 1), otherwise the frame itself."""
+    return df[df["is_total"] == 1] if "is_total" in df.columns else df
+
+
+def expect_zero(column: str) -> Callable[[pd.DataFrame], str | None]:
+    def check(df: pd.DataFrame) -> str | None:
+        df = totals(df)
+        value = int(df[column].iloc[0] or 0) if not df.empty else 0
+        return None if value == 0 else f"{column} = {value:,}, expected 0"
+    return check
+
+
+def expect_rows(count: int) -> Callable[[pd.DataFrame], str | None]:
+    def check(df: pd.DataFrame) -> str | None:
+        return None if len(df) == count else f"{len(df)} rows, expected {count}"
+    return check
+
+
+def expect_all_positive(column: str) -> Callable[[pd.DataFrame], str | None]:
+    def check(df: pd.DataFrame) -> str | None:
+        if df.empty:
+            return "no rows returned"
+        empty = df.loc[df[column].fillna(0) <= 0].iloc[:, 0].tolist()
+        return None if not empty else f"{column} is 0 for {', '.join(map(str, empty))}"
+    return check
+
+
+def expect_value(column: str, expected) -> Callable[[pd.DataFrame], str | None]:
+    def check(df: pd.DataFrame) -> str | None:
+        value = df[column].iloc[0] if not df.empty else None
+        return None if value == expected else f"{column} = {value}, expected {expected}"
+    return check
+
+
+def expect_min(column: str, minimum: float) -> Callable[[pd.DataFrame], str | None]:
+    def check(df: pd.DataFrame) -> str | None:
+        df = totals(df)
+        value = float(df[column].iloc[0] or 0) if not df.empty else 0.0
+        return None if value >= minimum else f"{column} = {value}, expected at least {minimum}"
+    return check
+
+
+@dataclass(frozen=True)
+class Check:
+    id: str
+    file: str
+    title: str
+    severity: str = "info"          # critical | warning | info
+    expect: Callable[[pd.DataFrame], str | None] | None = None
+    timeout_s: float = 30.0         # server-side limit (MySQL max_execution_time)
+    cost: str = "cheap"             # cheap | expensive (skipped once the time budget is spent)
+    tables: tuple[str, ...] = ()    # tables read; () = schema/metadata, always run
+    query: str | None = None        # statement to assert on when it is shared (default: id)
+
+    @property
+    def statement(self) -> str:
+        return self.query or self.id
+
+
+CHECKS = [
+    # schema snapshot
+    Check("list_tables", SCHEMA_SQL, "Check that all main tables were created"),
+    Check("list_columns", SCHEMA_SQL, "Show table columns to confirm the database structure"),
+    Check("list_views", SCHEMA_SQL, "Check that all required views exist"),
+    Check("view_current_package_shortages", SCHEMA_SQL, "View definition for current package shortages"),
+    Check("view_multi_package_shortages", SCHEMA_SQL, "View definition for products with multiple affected packages"),
+    Check("view_manufacturer_risk_analysis", SCHEMA_SQL, "View definition for manufacturer-level shortage risk"),
+    Check("view_current_manufacturer_risk", SCHEMA_SQL, "View definition for current manufacturer shortages"),
+    Check("table_raw_ndc", SCHEMA_SQL, "Table structure for NDC product data (raw_ndc)"),
+    Check("table_raw_ndc_packaging", SCHEMA_SQL, "Table structure for NDC packaging data"),
+    Check("table_raw_drug_shortages", SCHEMA_SQL, "Table structure for FDA drug shortage data"),
+    Check("table_shortages_with_ndc", SCHEMA_SQL, "Table structure for joined shortage and NDC data"),
+
+    # pipeline health
+    Check("required_tables_exist", HEALTH_SQL, "Confirm required tables exist after the pipeline run",
+          severity="critical", expect=expect_rows(5)),
+    Check("tables_have_rows", HEALTH_SQL, "Check that all main tables contain data",
+          severity="critical", expect=expect_all_positive("row_count"),
+          tables=("raw_ndc", "raw_ndc_packaging", "raw_drug_shortages", "shortages_with_ndc")),
+    Check("joined_table_populated", HEALTH_SQL, "Confirm the joined table was created successfully",
+          severity="critical", expect=expect_value("result", "PASS"), tables=("shortages_with_ndc",)),
+    Check("latest_update_date", HEALTH_SQL, "Check the most recent update date in the data",
+          tables=("shortages_with_ndc",)),
+    Check("views_available", HEALTH_SQL, "Confirm all analytical views are available",
+          severity="critical", expect=expect_rows(4)),
+
+    # data quality: one profile scan per table, the checks assert on its totals row
+    Check("profile_shortages_with_ndc", QUALITY_SQL, "Quality profile of the joined table (one scan)",
+          tables=("shortages_with_ndc",)),
+    Check("ndc_join_coverage", QUALITY_SQL, "Check how many shortages successfully matched to NDC data",
+          severity="warning", expect=expect_min("join_success_pct", 50), tables=("shortages_with_ndc",),
+          query="profile_shortages_with_ndc"),
+    Check("missing_package_ndc", QUALITY_SQL, "Check for missing package NDC values",
+          severity="warning", expect=expect_zero("missing_package_ndc"), tables=("shortages_with_ndc",),
+          query="profile_shortages_with_ndc"),
+    Check("missing_company_name", QUALITY_SQL, "Check for missing manufacturer names",
+          severity="warning", expect=expect_zero("missing_company_name"), tables=("shortages_with_ndc",),
+          query="profile_shortages_with_ndc"),
+    Check("missing_status", QUALITY_SQL, "Check for missing shortage status values",
+          severity="warning", expect=expect_zero("missing_status"), tables=("shortages_with_ndc",),
+          query="profile_shortages_with_ndc"),
+    Check("duplicate_shortage_ids", QUALITY_SQL, "Check for duplicate shortage records",
+          severity="critical", expect=expect_zero("duplicate_shortage_ids"), tables=("shortages_with_ndc",),
+          query="profile_shortages_with_ndc"),
+    Check("profile_raw_drug_shortages", QUALITY_SQL, "Quality profile of the loaded shortages (one scan)",
+          tables=("raw_drug_shortages",)),
+    Check("duplicate_shortage_keys", QUALITY_SQL, "Check for duplicate shortage keys in the loaded data",
+          severity="critical", expect=expect_zero("duplicate_shortage_keys"), tables=("raw_drug_shortages",),
+          query="profile_raw_drug_shortages"),
+    Check("unmatched_sample", QUALITY_SQL, "Sample of shortages that did not match NDC data",
+          tables=("shortages_with_ndc",)),
+
+    # analysis queries (report content, no assertions)
+    Check("top_manufacturers", ANALYSIS_SQL, "Top manufacturers by current shortage risk",
+          tables=("current_manufacturer_risk",)),
+    Check("brand_vs_generic", ANALYSIS_SQL, "Brand name vs generic drug shortages",
+          tables=("shortages_with_ndc",)),
+    Check("multi_package_products", ANALYSIS_SQL, "Products with multiple package shortages",
+          tables=("multi_package_shortages",)),
+    Check("product_type_duration", ANALYSIS_SQL, "Prescription vs OTC shortage duration",
+          tables=("shortages_with_ndc",)),
+    Check("package_types", ANALYSIS_SQL, "Package types in current shortages",
+          tables=("shortages_with_ndc",)),
+    Check("route_groups", ANALYSIS_SQL, "Route of administration shortage analysis",
+          tables=("shortages_with_ndc",)),
+    Check("match_rate", ANALYSIS_SQL, "Match rate analysis", tables=("shortages_with_ndc",)),
+    Check("marketing_categories", ANALYSIS_SQL, "Marketing category impact on shortages",
+          tables=("shortages_with_ndc",)),
+    Check("current_shortage_list", ANALYSIS_SQL, "Detailed current shortage list", cost="expensive",
+          tables=("shortages_with_ndc",)),
+    Check("portfolio_vs_risk", ANALYSIS_SQL, "Manufacturer portfolio size vs shortage risk",
+          timeout_s=120.0, cost="expensive", tables=("shortages_with_ndc", "raw_ndc")),
+    Check("analysis_ready", ANALYSIS_SQL, "Analysis queries ran successfully and show join value"),
+]
+
+
+def load_named_queries(path: str) -> dict[str, str]:
+    """
+    Statements of a SQL file keyed by their '-- name: <id>' marker. A
+    statement runs until the next marker, so ';' inside strings is safe;
+    anything before the first marker (USE, file comments) is ignored.
+    """
+    queries: dict[str, list[str]] = {}
+    current = None
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        match = NAME_RE.match(line.strip())
+        if match:
+            current = match.group(1)
+            queries[current] = []
+        elif current is not None and line.strip() and not line.strip().startswith("--"):
+            queries[current].append(line)
+    return {name: "\n".join(lines).strip().rstrip(";").strip() for name, lines in queries.items()}
+
+
+def affected_tables(changed: set[str]) -> set[str]:
+    """changed plus every table derived from them."""
+    affected, pending = set(), list(changed)
+    while pending:
+        table = pending.pop()
+        if table not in affected:
+            affected.add(table)
+            pending.extend(DERIVED_TABLES.get(table, []))
+    return affected
+
+
+def select_checks(checks: list[Check], changed: set[str] | None) -> list[Check]:
+    """Checks to run: all of them, or (when changed is given) those reading an affected table."""
+    if changed is None:
+        return list(checks)
+    affected = affected_tables(changed)
+    return [c for c in checks if not c.tables or affected.intersection(c.tables)]
@@ -0,0 +1,180 @@
+#Time-series store for pipeline and monitoring metrics (monitoring/reports/metrics_history.sqlite).
+#Every run appends one row per metric, so row counts, join rate, null rates, stage
+#timings and download sizes keep their history instead of being overwritten with the
+#report. The query functions below give a metric's history, the latest value against
+#the median of the previous runs, and the regressions among them.
+#Run directly for a quick look: python monitoring/metrics_store.py trend|regressions|history
+
+
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+METRICS_DB = Path("monitoring/reports/metrics_history.sqlite")
+
+DEFAULT_WINDOW = 7          # previous runs in the baseline median
+DEFAULT_THRESHOLD_PCT = 40  # change against the baseline that counts as a regression
+
+# Direction in which a metric gets worse (prefix match); others are only tracked
+WORSE_WHEN = {
+    "stage_seconds:": "up",
+    "pipeline_seconds": "up",
+    "monitoring_seconds": "up",
+    "null_pct:": "up",
+    "date_failed_pct:": "up",
+    "duplicates:": "up",
+    "rows:": "down",
+    "join_success_pct": "down",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, metric)
+);
+CREATE INDEX IF NOT EXISTS idx_metrics_metric ON metrics (metric, recorded_at);
+"""
+
+
+def connect(path: Path = METRICS_DB) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def record_metrics(source: str, metrics: dict[str, float | None], run_id: str | None = None,
+                   path: Path = METRICS_DB) -> str:
+    """Append one run's metrics (None values are skipped) and return its run id."""
+    now = datetime.utcnow()
+    recorded_at = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+    run_id = run_id or f"{source}-{now:%Y%m%dT%H%M%S%f}"
+    rows = [(run_id, recorded_at, source, metric, float(value))
+            for metric, value in metrics.items() if value is not None]
+    with connect(path) as conn:
+        # a re-run with the same id replaces its own rows, history is never rewritten
+        conn.executemany("INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?, ?)", rows)
+    conn.close()
+    return run_id
+
+
+def metric_history(metric: str, limit: int | None = None, path: Path = METRICS_DB) -> pd.DataFrame:
+    """Values of one metric, oldest first (the last limit runs when given)."""
+    with connect(path) as conn:
+        df = pd.read_sql_query(
+            "SELECT run_id, recorded_at, value FROM metrics WHERE metric = ? "
+            "ORDER BY recorded_at DESC, rowid DESC LIMIT ?",
+            conn, params=(metric, -1 if limit is None else limit),
+        )
+    conn.close()
+    return df.iloc[::-1].reset_index(drop=True)
+
+
+def worse_when(metric: str) -> str | None:
+    for prefix, direction in WORSE_WHEN.items():
+        if metric.startswith(prefix):
+            return direction
+    return None
+
+
+def trend_table(window: int = DEFAULT_WINDOW, metrics: list[str] | None = None,
+                path: Path = METRICS_DB) -> pd.DataFrame:
+    """
+    Latest value of every metric against the median of its previous window
+    values: one row per metric with latest, baseline, runs (in the
+    baseline) and change_pct (None when the baseline is 0 or missing).
+    """
+    with connect(path) as conn:
+        df = pd.read_sql_query(
+            """
+            SELECT metric, value, recorded_at, position
+            FROM (
+              SELECT metric, value, recorded_at,
+                     ROW_NUMBER() OVER (PARTITION BY metric ORDER BY recorded_at DESC, rowid DESC) AS position
+              FROM metrics
+            ) ranked
+            WHERE position <= ?
+            """,
+            conn, params=(window + 1,),
+        )
+    conn.close()
+    if metrics is not None:
+        df = df[df["metric"].isin(metrics)]
+
+    latest = df[df["position"] == 1].set_index("metric")
+    previous = df[df["position"] > 1].groupby("metric")["value"]
+    trend = pd.DataFrame({
+        "recorded_at": latest["recorded_at"],
+        "latest": latest["value"],
+        "baseline": previous.median(),
+        "runs": previous.size(),
+    }).dropna(subset=["latest"])
+    trend["runs"] = trend["runs"].fillna(0).astype(int)
+    baseline = trend["baseline"].where(trend["baseline"] != 0)
+    trend["change_pct"] = ((trend["latest"] - baseline) / baseline.abs() * 100).round(1)
+    trend["worse_when"] = [worse_when(m) for m in trend.index]
+    return trend.rename_axis("metric").reset_index()
+
+
+def find_regressions(threshold_pct: float = DEFAULT_THRESHOLD_PCT, window: int = DEFAULT_WINDOW,
+                     min_runs: int = 3, path: Path = METRICS_DB) -> pd.DataFrame:
+    """
+    Metrics whose latest value moved at least threshold_pct against the
+    baseline median in the direction that makes them worse, e.g. a stage
+    taking 40% longer or a table losing 40% of its rows. Metrics with fewer
+    than min_runs previous values are left out.
+    """
+    trend = trend_table(window, path=path)
+    change = trend["change_pct"]
+    worse = ((trend["worse_when"] == "up") & (change >= threshold_pct)) | \
+            ((trend["worse_when"] == "down") & (change <= -threshold_pct))
+    return trend[worse & (trend["runs"] >= min_runs)].reset_index(drop=True)
+
+
+def describe_regression(row) -> str:
+    """One line, e.g. 'stage_seconds:load up 52.0% vs the 7-run median (81.2 -> 123.4)'."""
+    direction = "up" if row["change_pct"] > 0 else "down"
+    return (f"{row['metric']} {direction} {abs(row['change_pct']):.1f}% vs the {row['runs']}-run median "
+            f"({row['baseline']:,.4g} -> {row['latest']:,.4g})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the pipeline metrics history")
+    parser.add_argument("command", choices=["trend", "regressions", "history"])
+    parser.add_argument("metric", nargs="?", help="metric name (history only)")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                        help=f"previous runs in the baseline median (default {DEFAULT_WINDOW})")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_PCT,
+                        help=f"%% change counted as a regression (default {DEFAULT_THRESHOLD_PCT})")
+    parser.add_argument("--db", type=Path, default=METRICS_DB, help=f"metrics database (default {METRICS_DB})")
+    args = parser.parse_intermixed_args()
+
+    if args.command == "history":
+        if not args.metric:
+            parser.error("history needs a metric name")
+        print(metric_history(args.metric, path=args.db).to_string(index=False))
+    elif args.command == "trend":
+        print(trend_table(args.window, path=args.db).to_string(index=False))
+    else:
+        regressions = find_regressions(args.threshold, args.window, path=args.db)
+        if regressions.empty:
+            print(f"No regressions above {args.threshold}% vs the {args.window}-run median")
+            return
+        for _, row in regressions.iterrows():
+            print(f"✗ {describe_regression(row)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ USE fda_shortage_db;
 
 -- ensure table exist
 
+-- name: required_tables_exist
 SELECT
     table_name,
     'exists' AS status
@@ -25,6 +26,7 @@ ORDER BY table_name;
 
 -- Confirms that tables are not empty after loading
 
+-- name: tables_have_rows
 SELECT 'raw_ndc' AS table_name, COUNT(*) AS row_count FROM raw_ndc
 UNION ALL
 SELECT 'raw_ndc_packaging', COUNT(*) FROM raw_ndc_packaging
@@ -37,6 +39,7 @@ SELECT 'shortages_with_ndc', COUNT(*) FROM shortages_with_ndc;
 
 -- Confirms that the joined table contains data
 
+-- name: joined_table_populated
 SELECT
     'shortages_with_ndc_status' AS check_name,
     CASE
@@ -49,6 +52,7 @@ FROM shortages_with_ndc;
 
 -- Checks most recent update_date available
 
+-- name: latest_update_date
 SELECT
     'latest_update_date' AS metric,
     MAX(update_date) AS most_recent_update
@@ -57,6 +61,7 @@ FROM shortages_with_ndc;
 
 -- Confirms analytical views were created successfully
 
+-- name: views_available
 SELECT
     table_name AS view_name,
     'available' AS status
@@ -0,0 +1,85 @@
+#Turns the single-scan quality profiles from data_quality_checks.sql into one
+#structured metrics record per monitoring run (monitoring/reports/quality_metrics.json).
+#Each profile returns a row per status plus a totals row (is_total = 1).
+
+
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+QUALITY_METRICS_JSON = Path("monitoring/reports/quality_metrics.json")
+
+# table -> profile statement in data_quality_checks.sql
+PROFILES = {
+    "shortages_with_ndc": "profile_shortages_with_ndc",
+    "raw_drug_shortages": "profile_raw_drug_shortages",
+}
+
+
+def to_number(value):
+    """MySQL aggregates come back as Decimal/int/float; store plain JSON numbers."""
+    if value is None or pd.isna(value):
+        return None
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def table_metrics(df: pd.DataFrame) -> dict:
+    """Totals row as metrics, plus the row count per status."""
+    total = df[df["is_total"] == 1]
+    metrics = {
+        column: to_number(value)
+        for column, value in total.iloc[0].items()
+        if column not in ("status", "is_total")
+    } if not total.empty else {}
+    by_status = df[df["is_total"] == 0]
+    metrics["status_distribution"] = {
+        ("(missing)" if pd.isna(status) else str(status)): int(count)
+        for status, count in zip(by_status["status"], by_status["row_count"])
+    }
+    return metrics
+
+
+def quality_record(results: dict[str, dict], pipeline_version=None) -> dict:
+    """One record for the run: metrics per profiled table (or the reason it is missing)."""
+    record = {
+        "generated_at": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "pipeline_version": to_number(pipeline_version),
+        "tables": {},
+    }
+    for table, statement in PROFILES.items():
+        result = results.get(statement)
+        if result is None:
+            record["tables"][table] = {"error": "not run (not selected)"}
+        elif result["df"] is None:
+            record["tables"][table] = {"error": result["error"] or result["skipped"]}
+        else:
+            record["tables"][table] = table_metrics(result["df"])
+    return record
+
+
+def write_quality_record(record: dict, path: Path = QUALITY_METRICS_JSON) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(record, indent=2) + "\n", encoding="utf-8")
+
+
+def flat_metrics(record: dict) -> dict[str, float]:
+    """Numeric metrics of a quality record for the metrics history (null rates in %)."""
+    metrics = {}
+    for table, values in record["tables"].items():
+        rows = values.get("row_count")
+        if not rows:
+            continue
+        if values.get("join_success_pct") is not None:
+            metrics["join_success_pct"] = values["join_success_pct"]
+        for column, value in values.items():
+            if column.startswith("missing_") and value is not None:
+                metrics[f"null_pct:{table}.{column[len('missing_'):]}"] = round(value * 100.0 / rows, 4)
+            elif column.startswith("duplicate_") and value is not None:
+                metrics[f"duplicates:{table}.{column[len('duplicate_'):]}"] = value
+    return metrics
@@ -8,20 +8,31 @@
 
 from __future__ import annotations
 # libraries
+import argparse
+import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
 import pandas as pd
 from sqlalchemy import create_engine, text
 
+from checks import CHECKS, Check, load_named_queries, select_checks
+from metrics_store import DEFAULT_THRESHOLD_PCT, DEFAULT_WINDOW, METRICS_DB, find_regressions, record_metrics
+from quality_profile import QUALITY_METRICS_JSON, flat_metrics, quality_record, write_quality_record
+
 # Directory where monitoring reports will be saved
 
 REPORT_DIR = Path("monitoring/reports")
 REPORT_MD = REPORT_DIR / "monitoring_report.md"
 REPORT_TXT = REPORT_DIR / "monitoring_report.txt"
 
-# # SQL files executed as part of monitoring
+# Written by scripts/process_data.py (date parse counts per column)
+PROCESS_METRICS = Path("data/process_metrics.json")
+
+# # SQL files executed as part of monitoring (report sections, in this order)
 # These cover schema validation, pipeline health, data quality, and analysis
 
 SQL_FILES = [
@@ -30,49 +41,45 @@ SQL_FILES = [
     "monitoring/data_quality_checks.sql",
     "sql/03_analysis_queries.sql",
 ]
-# headings for report
-STATEMENT_TITLES = {
-    "schema_snapshot.sql": {
-        1: "Check that all main tables were created",
-        2: "Show table columns to confirm the database structure",
-        3: "Check that all required views exist",
-        4: "View definition for current package shortages",
-        5: "View definition for products with multiple affected packages",
-        6: "View definition for manufacturer-level shortage risk",
-        7: "View definition for current manufacturer shortages",
-        8: "Table structure for NDC product data (raw_ndc)",
-        9: "Table structure for NDC packaging data",
-        10: "Table structure for FDA drug shortage data",
-        11: "Table structure for joined shortage and NDC data",
-    },
-
-    "pipeline_health.sql": {
-        1: "Confirm required tables exist after the pipeline run",
-        2: "Check that all main tables contain data",
-        3: "Confirm the joined table was created successfully",
-        4: "Check the most recent update date in the data",
-        5: "Confirm all analytical views are available",
-    },
-
-    "data_quality_checks.sql": {
-        1: "Check how many shortages successfully matched to NDC data",
-        2: "Check for missing package NDC values",
-        3: "Check for missing manufacturer names",
-        4: "Check for missing shortage status values",
-        5: "Check for duplicate shortage records",
-        6: "Check for invalid initial posting dates",
-        7: "Check for invalid update dates",
-        8: "Summary of shortages by status",
-        9: "Sample of shortages that did not match NDC data",
-    },
-
-    "03_analysis_queries.sql": {
-        1: "Analysis queries ran successfully and show join value",
-    },
+# Check titles, severities, assertions and costs live in checks.py;
+# statements are found by their "-- name: <id>" marker in these files
+
+# Written by scripts/load_to_mysql.py: tables whose contents changed in the last load
+LOAD_CHANGES = Path("data/load_changes.json")
+
+# Queries behind the readable summary, run alongside the SQL files
+ROW_COUNT_TABLES = ["raw_ndc", "raw_ndc_packaging", "raw_drug_shortages", "shortages_with_ndc"]
+
+SUMMARY_QUERIES = {
+    "pipeline_version": "SELECT version FROM pipeline_version WHERE id = 1",
+    **{f"rows:{t}": f"SELECT COUNT(*) AS row_count FROM {t}" for t in ROW_COUNT_TABLES},
+    "join_success": """
+        SELECT
+          COUNT(*) AS total_rows,
+          SUM(product_ndc IS NOT NULL) AS joined_rows,
+          SUM(product_ndc IS NULL) AS unjoined_rows,
+          ROUND(SUM(product_ndc IS NOT NULL) * 100.0 / NULLIF(COUNT(*), 0), 2) AS join_success_pct
+        FROM shortages_with_ndc
+        """,
+    "top_manufacturers": """
+        SELECT company_name, current_affected_packages, current_affected_products
+        FROM current_manufacturer_risk
+        ORDER BY current_affected_packages DESC
+        LIMIT 15
+        """,
+    "package_types": """
+        SELECT
+          package_type,
+          COUNT(*) AS shortage_count
+        FROM shortages_with_ndc
+        WHERE status = 'Current' AND package_type IS NOT NULL
+        GROUP BY package_type
+        ORDER BY shortage_count DESC
+        """,
 }
 
 # database connection
-def get_db_engine():
+def get_db_engine(pool_size: int = 5):
     user = os.getenv("DB_USER", "pipeline_user")
     password = os.getenv("DB_PASSWORD", "pipeline_password")
     host = os.getenv("DB_HOST", "127.0.0.1")
@@ -80,36 +87,8 @@ def get_db_engine():
     db = os.getenv("DB_NAME", "fda_shortage_db")
 
     conn_str = f"mysql+mysqlconnector://{user}:{password}@{host}:{port}/{db}"
-    return create_engine(conn_str, pool_pre_ping=True)
-
-# split sql into executable statements
-def split_sql_into_statements(sql_text: str) -> list[str]:
-    """
-    Split SQL into executable statements.
-    - ignores blank lines and comment
-    - splits by ';'
-    """
-    statements: list[str] = []
-    buffer: list[str] = []
-
-    for line in sql_text.splitlines():
-        stripped = line.strip()
-        if not stripped or stripped.startswith("--"):
-            continue
-
-        buffer.append(line)
-        if stripped.endswith(";"):
-            stmt = "\n".join(buffer).strip()
-            if stmt:
-                statements.append(stmt)
-            buffer = []
-
-    if buffer:
-        stmt = "\n".join(buffer).strip()
-        if stmt:
-            statements.append(stmt)
-
-    return statements
+    # one connection per worker; checks never wait on each other for a connection
+    return create_engine(conn_str, pool_pre_ping=True, pool_size=pool_size, max_overflow=0)
 
 # converts dataframe into markdown table
 def df_to_markdown(df: pd.DataFrame, max_rows: int = 25) -> str:
@@ -125,51 +104,132 @@ def safe_sql_preview(stmt: str, max_lines: int = 25) -> str:
     return "\n".join(lines[:max_lines])
 
 
-def run_sql_file(conn, file_path: str) -> tuple[list[str], bool]:
-    p = Path(file_path)
+def run_check(engine, stmt: str | None, timeout_s: float = 30.0,
+              expensive: bool = False, deadline: float | None = None) -> dict:
+    """Run one read-only statement on its own pooled connection and time it."""
+    result = {"df": None, "error": None, "skipped": None, "seconds": 0.0}
+    if stmt is None:
+        result["error"] = "statement not found"
+        return result
+    if expensive and deadline is not None and time.perf_counter() > deadline:
+        result["skipped"] = "time budget spent"
+        return result
+
+    start = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            if conn.dialect.name == "mysql":
+                # server-side limit; applies to SELECT statements
+                conn.execute(text(f"SET SESSION max_execution_time = {int(timeout_s * 1000)}"))
+            rows = conn.execute(text(stmt))
+            if rows.returns_rows:
+                result["df"] = pd.DataFrame(rows.fetchall(), columns=rows.keys())
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_checks(engine, jobs: list[dict], workers: int) -> list[dict]:
+    """
+    Run jobs (run_check keyword arguments) concurrently. Cheap jobs start
+    first so a time budget only ever skips expensive ones; results come back
+    in the order given.
+    """
+    order = sorted(range(len(jobs)), key=lambda i: jobs[i].get("expensive", False))
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        done = list(pool.map(lambda i: run_check(engine, **jobs[i]), order))
+    results: list[dict] = [{}] * len(jobs)
+    for i, result in zip(order, done):
+        results[i] = result
+    return results
+
+
+def load_check_sql(checks: list[Check]) -> dict[str, str | None]:
+    """SQL for every check by id (None when its file or marker is missing)."""
+    files = {}
+    for sql_file in {c.file for c in checks}:
+        files[sql_file] = load_named_queries(sql_file) if Path(sql_file).exists() else {}
+    return {c.id: files[c.file].get(c.statement) for c in checks}
+
+
+def check_status(check: Check, result: dict) -> tuple[str, str | None]:
+    """PASS/FAIL/WARN/SKIP/INFO for a check result, with the reason."""
+    if result["skipped"]:
+        return "SKIP", result["skipped"]
+    if result["error"]:
+        return "FAIL", result["error"]
+    if check.expect is None:
+        return "INFO", None
+    message = check.expect(result["df"] if result["df"] is not None else pd.DataFrame())
+    if message is None:
+        return "PASS", None
+    return ("FAIL" if check.severity == "critical" else "WARN"), message
+
+
+def render_sql_file(file_path: str, checks: list[Check], sql: dict[str, str | None],
+                    results: dict[str, dict]) -> tuple[list[str], bool]:
     lines: list[str] = []
     failed = False
 
     lines.append(f"\n## Results from `{file_path}`")
 
-    if not p.exists():
+    if not Path(file_path).exists():
         lines.append(f"FAIL: Missing file `{file_path}`")
         return lines, True
 
-    sql_text = p.read_text(encoding="utf-8")
-
-    # Also support SHOW CREATE statements (they end with ';' too)
-    statements = split_sql_into_statements(sql_text)
-
-    if not statements:
-        lines.append("WARN: No executable SQL statements found.")
+    if not checks:
+        lines.append("_(no checks selected for this run)_")
         return lines, False
 
-    for i, stmt in enumerate(statements, start=1):
-        if stmt.strip().upper().startswith("USE "):
+    for check in checks:
+        result = results[check.id]
+        status, message = check_status(check, result)
+        lines.append(f"\n### {check.title}")
+        lines.append(f"`{check.id}` · {check.severity} · {check.cost}")
+        if check.query:
+            # shares a statement shown elsewhere in the report: only the verdict here
+            lines.append(f"{status}: {message}" if message else f"{status} (asserted on `{check.query}`)")
+            failed = failed or status == "FAIL"
             continue
-
-        title = STATEMENT_TITLES.get(p.name, {}).get(i, f"Statement {i}")
-        lines.append(f"\n### {title}")
-        lines.append("```sql")
-        lines.append(safe_sql_preview(stmt))
-        lines.append("```")
-
-        try:
-            result = conn.execute(text(stmt))
-            if result.returns_rows:
-                df = pd.DataFrame(result.fetchall(), columns=result.keys())
-                lines.append(df_to_markdown(df))
-            else:
-                lines.append("Executed successfully (no rows returned).")
-        except Exception as e:
-            lines.append(f"FAIL: {type(e).__name__}: {e}")
-            failed = True
+        if sql[check.id]:
+            lines.append("```sql")
+            lines.append(safe_sql_preview(sql[check.id]))
+            lines.append("```")
+
+        if status != "INFO":
+            lines.append(f"{status}: {message}" if message else status)
+        failed = failed or status == "FAIL"
+        if result["df"] is not None:
+            lines.append(df_to_markdown(result["df"]))
+        elif status in ("PASS", "INFO"):
+            lines.append("Executed successfully (no rows returned).")
+        if not result["skipped"]:
+            lines.append(f"_({result['seconds'] * 1000:.0f} ms)_")
 
     return lines, failed
 
 
-def add_readable_summary(conn) -> list[str]:
+def read_changed_tables() -> set[str] | None:
+    """Tables the last load changed, or None (run everything) if it did not say."""
+    if not LOAD_CHANGES.exists():
+        return None
+    return set(json.loads(LOAD_CHANGES.read_text(encoding="utf-8")).get("tables", []))
+
+
+def summary_frame(results: dict[str, dict], name: str) -> pd.DataFrame:
+    """Result of a summary query; an empty frame if it failed."""
+    result = results[name]
+    return result["df"] if result["df"] is not None else pd.DataFrame()
+
+
+def summary_table(results: dict[str, dict], name: str, max_rows: int) -> str:
+    if results[name]["error"]:
+        return f"FAIL: {results[name]['error']}"
+    return df_to_markdown(summary_frame(results, name), max_rows=max_rows)
+
+
+def add_readable_summary(results: dict[str, dict]) -> list[str]:
     
     lines: list[str] = []
     lines.append("\n---\n# Monitoring Summary")
@@ -180,12 +240,9 @@ def add_readable_summary(conn) -> list[str]:
     # Row counts
     
     counts = []
-    for t in ["raw_ndc", "raw_ndc_packaging", "raw_drug_shortages", "shortages_with_ndc"]:
-        try:
-            c = pd.read_sql(text(f"SELECT COUNT(*) AS row_count FROM {t};"), conn)["row_count"].iloc[0]
-            counts.append({"table": t, "rows": int(c)})
-        except Exception:
-            counts.append({"table": t, "rows": "N/A"})
+    for t in ROW_COUNT_TABLES:
+        df = summary_frame(results, f"rows:{t}")
+        counts.append({"table": t, "rows": int(df["row_count"].iloc[0]) if not df.empty else "N/A"})
     lines.append("\n## Row counts")
     lines.append(
         "\nThis table confirms that data was successfully loaded into each core table "
@@ -194,67 +251,94 @@ def add_readable_summary(conn) -> list[str]:
 
     # Join success
     
-    join_df = pd.read_sql(
-        text("""
-        SELECT
-          COUNT(*) AS total_rows,
-          SUM(product_ndc IS NOT NULL) AS joined_rows,
-          SUM(product_ndc IS NULL) AS unjoined_rows,
-          ROUND(SUM(product_ndc IS NOT NULL) * 100.0 / NULLIF(COUNT(*), 0), 2) AS join_success_pct
-        FROM shortages_with_ndc;
-        """),
-        conn
-    )
     lines.append("\n## Join success:Drug shortages to NDC products")
     lines.append(
         "\nThis check measures how many drug shortage records were successfully "
         "matched to NDC product information.")
-    lines.append(df_to_markdown(join_df, max_rows=5))
+    lines.append(summary_table(results, "join_success", max_rows=5))
+
+    # Date parsing (done in process_data.py, failures are NULL in the database)
+
+    if PROCESS_METRICS.exists():
+        metrics = json.loads(PROCESS_METRICS.read_text(encoding="utf-8")).get("date_parsing", {})
+        date_rows = [
+            {"table": table, "column": column, "parsed": s["parsed"], "missing": s["missing"],
+             "failed": s["failed"], "failed_examples": ", ".join(s["failed_examples"])}
+            for table, columns in metrics.items()
+            for column, s in columns.items()
+        ]
+        lines.append("\n## Date parsing")
+        lines.append(
+            "\nDates are parsed once during processing. Values that did not match a known "
+            "format are stored as NULL and counted here.")
+        lines.append(df_to_markdown(pd.DataFrame(date_rows)))
 
     # Top manufacturers
     
-    manu_df = pd.read_sql(
-        text("""
-        SELECT company_name, current_affected_packages, current_affected_products
-        FROM current_manufacturer_risk
-        ORDER BY current_affected_packages DESC
-        LIMIT 15;
-        """),
-        conn
-    )
     lines.append("\n## Manufacturers Most impacted by current shortages")
     lines.append("\nShows manufacturers with the highest number of affected products and packages.")
-    lines.append(df_to_markdown(manu_df, max_rows=20))
+    lines.append(summary_table(results, "top_manufacturers", max_rows=20))
 
     # Package types
     
-    pkg_df = pd.read_sql(
-        text("""
-        SELECT
-          CASE
-            WHEN LOWER(package_description) LIKE '%bottle%' THEN 'Bottle'
-            WHEN LOWER(package_description) LIKE '%vial%' THEN 'Vial'
-            WHEN LOWER(package_description) LIKE '%blister%' THEN 'Blister Pack'
-            WHEN LOWER(package_description) LIKE '%carton%' THEN 'Carton'
-            WHEN LOWER(package_description) LIKE '%kit%' THEN 'Kit'
-            ELSE 'Other/Unknown'
-          END AS package_type,
-          COUNT(*) AS shortage_count
-        FROM shortages_with_ndc
-        WHERE status = 'Current' AND package_description IS NOT NULL
-        GROUP BY package_type
-        ORDER BY shortage_count DESC;
-        """),
-        conn
-    )
     lines.append("\n## Package types most affected (current)")
-    lines.append(df_to_markdown(pkg_df, max_rows=20))
+    lines.append(summary_table(results, "package_types", max_rows=20))
 
     return lines
 
+def timing_section(timings: list[dict], wall_seconds: float) -> list[str]:
+    lines = ["\n## Check timings"]
+    total = sum(t["ms"] for t in timings) / 1000
+    lines.append(
+        f"\n{len(timings)} checks ran in {wall_seconds:.2f}s wall time "
+        f"({total:.2f}s if run one after another). Slowest checks:")
+    slowest = sorted(timings, key=lambda t: t["ms"], reverse=True)[:10]
+    lines.append(df_to_markdown(pd.DataFrame(slowest)))
+    return lines
+
+
+def history_metrics(summary_results: dict[str, dict], record: dict, wall_seconds: float | None) -> dict:
+    """This run's row counts, join rate, null rates and duration for the metrics history."""
+    metrics = {}
+    for t in ROW_COUNT_TABLES:
+        df = summary_frame(summary_results, f"rows:{t}")
+        if not df.empty:
+            metrics[f"rows:{t}"] = int(df["row_count"].iloc[0])
+    join_df = summary_frame(summary_results, "join_success")
+    if not join_df.empty and join_df["join_success_pct"].iloc[0] is not None:
+        metrics["join_success_pct"] = float(join_df["join_success_pct"].iloc[0])
+    metrics.update(flat_metrics(record))
+    metrics["pipeline_version"] = record["pipeline_version"]
+    metrics["monitoring_seconds"] = round(wall_seconds, 2) if wall_seconds is not None else None
+    return metrics
+
+
+def trend_section() -> list[str]:
+    lines = ["\n## Trends"]
+    lines.append(
+        f"\nEvery run is appended to {METRICS_DB}. Metrics that moved at least "
+        f"{DEFAULT_THRESHOLD_PCT}% the wrong way against the median of the previous "
+        f"{DEFAULT_WINDOW} runs:")
+    regressions = find_regressions()
+    if regressions.empty:
+        lines.append("\nNone.")
+    else:
+        lines.append(df_to_markdown(regressions[["metric", "baseline", "latest", "change_pct", "runs"]]))
+    return lines
+
+
 #  Orchestrate database connection, SQL execution, and report generation.
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Run monitoring checks and write the report")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="checks run concurrently, one pooled connection each (default 4)")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="seconds; expensive checks not started by then are skipped")
+    parser.add_argument("--changed-only", action="store_true",
+                        help=f"run only checks reading tables the last load changed ({LOAD_CHANGES})")
+    args = parser.parse_args()
+
     REPORT_DIR.mkdir(parents=True, exist_ok=True)
 
     header = [
@@ -268,24 +352,77 @@ def main() -> None:
         "",
     ]
 
-    engine = get_db_engine()
-    report_lines = header
-    had_failure = False
-
+    changed = read_changed_tables() if args.changed_only else None
+    selected = select_checks(CHECKS, changed)
+    sql = load_check_sql(selected)
+    if changed is not None:
+        header += [f"**Changed tables this run:** {', '.join(sorted(changed)) or 'none'} "
+                   f"({len(selected)} of {len(CHECKS)} checks selected)", ""]
+
+    # Every check is read-only and independent: collect them all, run them
+    # over a bounded pool, then write the report in the original order
+    start = time.perf_counter()
+    deadline = start + args.budget if args.budget is not None else None
+    jobs = [{"stmt": stmt} for stmt in SUMMARY_QUERIES.values()]
+    # checks that assert on a shared statement (the quality profiles) reuse one run of it
+    statement_jobs: dict[tuple[str, str], int] = {}
+    for c in selected:
+        key = (c.file, c.statement)
+        if key not in statement_jobs:
+            statement_jobs[key] = len(jobs)
+            jobs.append({"stmt": sql[c.id], "timeout_s": c.timeout_s, "expensive": c.cost == "expensive",
+                         "deadline": deadline})
+
+    engine = get_db_engine(pool_size=max(args.workers, 1))
     try:
-        with engine.connect() as conn:
-            # Put readable summary first
-            report_lines.extend(add_readable_summary(conn))
-
-            # Then include full SQL outputs
-            report_lines.append("\n---\n# Full SQL outputs")
-            for sql_file in SQL_FILES:
-                lines, failed = run_sql_file(conn, sql_file)
-                report_lines.extend(lines)
-                had_failure = had_failure or failed
+        results = run_checks(engine, jobs, args.workers)
+        wall_seconds = time.perf_counter() - start
     finally:
         engine.dispose()
 
+    summary_results = dict(zip(SUMMARY_QUERIES, results))
+    check_results = {c.id: results[statement_jobs[(c.file, c.statement)]] for c in selected}
+    timings = [{"check": name, "ms": round(r["seconds"] * 1000, 1)} for name, r in summary_results.items()]
+    timings += [{"check": statement, "ms": round(results[i]["seconds"] * 1000, 1)}
+                for (_, statement), i in statement_jobs.items()]
+    skipped = [c.id for c in selected if check_results[c.id]["skipped"]]
+    if skipped:
+        header += [f"**Skipped (time budget of {args.budget:.0f}s spent):** {', '.join(skipped)}", ""]
+
+    report_lines = header
+    had_failure = any(r["error"] for r in summary_results.values())
+
+    # Put readable summary first
+    report_lines.extend(add_readable_summary(summary_results))
+
+    # Then include full SQL outputs
+    report_lines.append("\n---\n# Full SQL outputs")
+    for sql_file in SQL_FILES:
+        checks = [c for c in selected if c.file == sql_file]
+        lines, failed = render_sql_file(sql_file, checks, sql, check_results)
+        report_lines.extend(lines)
+        had_failure = had_failure or failed
+
+    report_lines.extend(timing_section(timings, wall_seconds))
+
+    # Structured data-quality record for this run (one profile scan per table)
+    version_df = summary_frame(summary_results, "pipeline_version")
+    record = quality_record(
+        {statement: results[i] for (_, statement), i in statement_jobs.items()},
+        pipeline_version=version_df["version"].iloc[0] if not version_df.empty else None,
+    )
+    write_quality_record(record)
+    print(f"Saved quality metrics to: {QUALITY_METRICS_JSON}")
+
+    # Metrics history: durations are only comparable between full runs
+    full_run = changed is None and args.budget is None
+    try:
+        record_metrics("monitoring", history_metrics(summary_results, record, wall_seconds if full_run else None))
+        report_lines.extend(trend_section())
+        print(f"Appended run metrics to: {METRICS_DB}")
+    except Exception as e:
+        report_lines.append(f"\n## Trends\n\nCould not update the metrics history: {e}")
+
     REPORT_MD.write_text("\n".join(report_lines) + "\n", encoding="utf-8")
     REPORT_TXT.write_text("\n".join(report_lines) + "\n", encoding="utf-8")
 
@@ -2,6 +2,7 @@
 -- Schema snapshot: tables, columns, and views
 
 -- List tables
+-- name: list_tables
 SELECT table_name
 FROM information_schema.tables
 WHERE table_schema = DATABASE()
@@ -9,25 +10,35 @@ WHERE table_schema = DATABASE()
 ORDER BY table_name;
 
 -- List columns
+-- name: list_columns
 SELECT table_name, column_name, data_type, is_nullable
 FROM information_schema.columns
 WHERE table_schema = DATABASE()
 ORDER BY table_name, ordinal_position;
 
 -- List views 
+-- name: list_views
 SELECT table_name AS view_name
 FROM information_schema.views
 WHERE table_schema = DATABASE()
 ORDER BY table_name;
 
 -- Show create view statements for key views
+-- name: view_current_package_shortages
 SHOW CREATE VIEW current_package_shortages;
+-- name: view_multi_package_shortages
 SHOW CREATE VIEW multi_package_shortages;
+-- name: view_manufacturer_risk_analysis
 SHOW CREATE VIEW manufacturer_risk_analysis;
+-- name: view_current_manufacturer_risk
 SHOW CREATE VIEW current_manufacturer_risk;
 
 -- Show create table statements for key tables
+-- name: table_raw_ndc
 SHOW CREATE TABLE raw_ndc;
+-- name: table_raw_ndc_packaging
 SHOW CREATE TABLE raw_ndc_packaging;
+-- name: table_raw_drug_shortages
 SHOW CREATE TABLE raw_drug_shortages;
+-- name: table_shortages_with_ndc
 SHOW CREATE TABLE shortages_with_ndc;
\ No newline at end of file
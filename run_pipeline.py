@@ -2,20 +2,43 @@
 #The order follwed for ETL steps is
 #dowload data
 #process data
+#validate processed tables
 #load to MYSQL
+#transform
+#Each run appends its stage timings to monitoring/reports/metrics_history.sqlite
 
 # run_pipeline.py
 from __future__ import annotations
 
-import os
+import json
 import subprocess
 import sys
+import time
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "monitoring"))
+
+from metrics_store import describe_regression, find_regressions, record_metrics  # noqa: E402
+
 REPORT_DIR = Path("monitoring/reports")
 PIPELINE_LOG = REPORT_DIR / "pipeline.log"
 
+# Written by the stages, added to the metrics history after the run
+DOWNLOAD_METRICS = Path("data/download_metrics.json")
+PROCESS_METRICS = Path("data/process_metrics.json")
+
+# (stage name, command), run in this order
+STAGES = [
+    ("download", "python scripts/download_data.py"),
+    ("process", "python scripts/process_data.py --streaming --format parquet"),
+    # stop here if the processed tables are not fit to load
+    ("validate", "python scripts/validate_data.py"),
+    ("load", "python scripts/load_to_mysql.py"),
+    # SQL transformations (incremental when the loader logged changes)
+    ("transform", "python scripts/run_transformations.py"),
+]
+
 
 def log_line(msg: str) -> None:
     timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
@@ -43,6 +66,37 @@ def run(cmd: str) -> None:
         raise subprocess.CalledProcessError(result.returncode, cmd)
 
 
+def stage_metrics(timings: dict[str, float], succeeded: bool) -> dict[str, float | None]:
+    """Stage timings plus what the stages wrote: bytes downloaded and date parse failures."""
+    metrics = {f"stage_seconds:{stage}": seconds for stage, seconds in timings.items()}
+    metrics["pipeline_seconds"] = round(sum(timings.values()), 2) if succeeded else None
+    metrics["pipeline_succeeded"] = 1 if succeeded else 0
+    if "download" in timings and DOWNLOAD_METRICS.exists():
+        metrics["download_bytes"] = json.loads(DOWNLOAD_METRICS.read_text(encoding="utf-8"))["bytes"]
+    if "process" in timings and PROCESS_METRICS.exists():
+        dates = json.loads(PROCESS_METRICS.read_text(encoding="utf-8")).get("date_parsing", {})
+        for table, columns in dates.items():
+            for column, stats in columns.items():
+                present = stats["rows"] - stats["missing"]
+                if present:
+                    metrics[f"date_failed_pct:{table}.{column}"] = round(stats["failed"] * 100.0 / present, 4)
+    return metrics
+
+
+def record_run(timings: dict[str, float], succeeded: bool) -> None:
+    """Append this run to the metrics history and log regressions against earlier runs."""
+    try:
+        metrics = stage_metrics(timings, succeeded)
+        run_id = record_metrics("pipeline", metrics)
+        log_line(f"Recorded metrics for run {run_id}")
+        regressions = find_regressions()
+        for _, row in regressions[regressions["metric"].isin(metrics)].iterrows():
+            log_line(f"REGRESSION: {describe_regression(row)}")
+    except Exception as e:
+        # the history is informational, never fail the pipeline over it
+        log_line(f"Could not record run metrics: {e}")
+
+
 def main() -> None:
     REPORT_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -50,26 +104,20 @@ def main() -> None:
     PIPELINE_LOG.write_text("", encoding="utf-8")
     log_line("Starting FDA ETL pipeline")
 
+    timings: dict[str, float] = {}
     try:
-        run("python scripts/download_data.py")
-        run("python scripts/process_data.py")
-        run("python scripts/load_to_mysql.py")
-
-        # SQL transformations
-        host = os.environ["DB_HOST"]
-        port = os.environ["DB_PORT"]
-        user = os.environ["DB_USER"]
-        pwd = os.environ["DB_PASSWORD"]
-        db = os.environ["DB_NAME"]
-
-        run(
-            f'mysql -h "{host}" -P "{port}" -u "{user}" -p"{pwd}" "{db}" < sql/02_transformations.sql'
-        )
+        for stage, cmd in STAGES:
+            start = time.perf_counter()
+            run(cmd)
+            # only completed stages are timed, a failed one would skew the history
+            timings[stage] = round(time.perf_counter() - start, 2)
 
         log_line("ETL pipeline completed successfully.")
+        record_run(timings, succeeded=True)
 
     except subprocess.CalledProcessError:
         log_line("ETL pipeline failed.")
+        record_run(timings, succeeded=False)
         sys.exit(1)
 
 
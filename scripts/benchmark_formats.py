@@ -0,0 +1,148 @@
+"""
+Intermediate Format Benchmark
+Times writing and reading the four processed tables as CSV and as Parquet.
+
+Run after process_data.py (it reads the CSVs in data/ as input), or on
+generated tables of a given size:
+    python scripts/benchmark_formats.py
+    python scripts/benchmark_formats.py --synthetic 1000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from table_formats import TABLE_SCHEMAS, parquet_available, read_table, table_path, write_table  # noqa: E402
+
+
+def synthetic_tables(packages: int, seed: int = 507) -> dict[str, pd.DataFrame]:
+    """
+    Processed tables shaped like process_data.py output: 3 packages per
+    product, one shortage (with a contact) per 10 packages.
+    """
+    rng = np.random.default_rng(seed)
+    products = max(packages // 3, 1)
+    shortages = max(packages // 10, 1)
+    product_ids = pd.Series(np.arange(products)).map(lambda i: f"{i:05d}-{i % 997:03d}")
+    days = pd.to_datetime("2000-01-01") + pd.to_timedelta(rng.integers(0, 9000, products), unit="D")
+
+    ndc_core = pd.DataFrame({
+        "product_ndc": product_ids,
+        "generic_name": "SYNTHETIC " + pd.Series(rng.integers(0, 5000, products)).astype(str),
+        "labeler_name": "LABELER " + pd.Series(rng.integers(0, 800, products)).astype(str),
+        "brand_name": np.where(rng.random(products) < 0.4, "BRAND", None),
+        "finished": True,
+        "marketing_category": rng.choice(["ANDA", "NDA", "BLA", "OTC MONOGRAPH FINAL"], products),
+        "dosage_form": rng.choice(["TABLET", "INJECTION, SOLUTION", "CAPSULE", "CREAM"], products),
+        "route": rng.choice(["['ORAL']", "['INTRAVENOUS']", "['TOPICAL']"], products),
+        "product_type": rng.choice(["HUMAN PRESCRIPTION DRUG", "HUMAN OTC DRUG"], products),
+        "marketing_start_date": days,
+        "application_number": "ANDA" + pd.Series(rng.integers(0, 999999, products)).astype(str),
+    })
+
+    owner = np.arange(packages) // 3 % products
+    ndc_packaging = pd.DataFrame({
+        "product_ndc": product_ids.to_numpy()[owner],
+        "package_ndc": product_ids.to_numpy()[owner] + "-" + pd.Series(np.arange(packages) % 3).map("{:02d}".format),
+        "description": pd.Series(rng.integers(1, 100, packages)).astype(str) + " VIAL in 1 CARTON",
+        "marketing_start_date": "20200101",
+    })
+
+    picked = rng.choice(packages, shortages, replace=False)
+    posted = pd.to_datetime("2012-01-01") + pd.to_timedelta(rng.integers(0, 4000, shortages), unit="D")
+    shortage_packages = ndc_packaging["package_ndc"].to_numpy()[picked]
+    drug_shortages_core = pd.DataFrame({
+        "package_ndc": shortage_packages,
+        "generic_name": "SYNTHETIC",
+        "company_name": "LABELER " + pd.Series(rng.integers(0, 800, shortages)).astype(str),
+        "status": rng.choice(["Current", "Resolved", "To Be Discontinued"], shortages),
+        "therapeutic_category": "['Anesthesia']",
+        "initial_posting_date": posted,
+        "update_date": posted + pd.to_timedelta(rng.integers(0, 400, shortages), unit="D"),
+        "dosage_form": "Injection, solution",
+        "reason": None,
+        "shortage_key": pd.Series(rng.integers(0, 2**63, shortages)).map("{:016x}".format),
+        "row_hash": pd.Series(rng.integers(0, 2**63, shortages)).map("{:016x}".format),
+    })
+    shortage_contacts = pd.DataFrame({
+        "package_ndc": shortage_packages,
+        "contact_info": "Call 1-800-000-0000",
+    })
+    return {
+        "ndc_core": ndc_core,
+        "ndc_packaging": ndc_packaging,
+        "drug_shortages_core": drug_shortages_core,
+        "shortage_contacts": shortage_contacts,
+    }
+
+
+def timed(func, *args, repeat: int = 3):
+    """Best of `repeat` runs (seconds) and the last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark CSV vs Parquet intermediates")
+    parser.add_argument("--data-dir", default="data", help="directory with the processed CSVs")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (best is kept)")
+    parser.add_argument("--synthetic", type=int, default=None, metavar="PACKAGES",
+                        help="benchmark generated tables with this many packages instead of data/")
+    args = parser.parse_args()
+
+    if not parquet_available():
+        print("pyarrow is not installed, nothing to compare")
+        return
+
+    if args.synthetic:
+        print(f"Generating synthetic tables with {args.synthetic:,} packages...")
+        synthetic = synthetic_tables(args.synthetic)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        for name in TABLE_SCHEMAS:
+            if args.synthetic:
+                df = synthetic[name]
+            else:
+                source = table_path(name, "csv", args.data_dir)
+                if not os.path.exists(source):
+                    print(f"Skipping {name}: {source} not found")
+                    continue
+                df = read_table(name, "csv", args.data_dir)
+
+            for fmt in ("csv", "parquet"):
+                write_s, path = timed(write_table, df, name, fmt, out_dir, repeat=args.repeat)
+                read_s, loaded = timed(read_table, name, fmt, out_dir, repeat=args.repeat)
+                rows.append({
+                    "table": name,
+                    "format": fmt,
+                    "rows": len(loaded),
+                    "size_mb": round(os.path.getsize(path) / 1024 / 1024, 2),
+                    "write_s": round(write_s, 3),
+                    "read_s": round(read_s, 3),
+                })
+
+    if not rows:
+        return
+
+    results = pd.DataFrame(rows)
+    print(results.to_string(index=False))
+
+    totals = results.groupby("format")[["size_mb", "write_s", "read_s"]].sum()
+    print("\nTotals:")
+    print(totals.to_string())
+
+
+if __name__ == "__main__":
+    main()
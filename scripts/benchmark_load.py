@@ -0,0 +1,62 @@
+"""
+Load Engine Benchmark
+Measures rows/sec for LOAD DATA LOCAL INFILE versus pandas to_sql against
+a running MySQL instance (e.g. the mysql:8.0 container used in CI).
+
+Each engine runs inside its own transaction that is rolled back afterwards,
+so the tables are left as they were.
+
+    python scripts/benchmark_load.py --format csv
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from load_to_mysql import clear_tables, get_engine, load_table  # noqa: E402
+from table_formats import resolve_format  # noqa: E402
+
+TABLE_PLAN = [
+    ("ndc_core", "raw_ndc"),
+    ("ndc_packaging", "raw_ndc_packaging"),
+    ("drug_shortages_core", "raw_drug_shortages"),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark MySQL load engines")
+    parser.add_argument("--format", choices=["auto", "csv", "parquet"], default="auto")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    results = []
+    try:
+        for engine_mode in ("bulk", "to_sql"):
+            with engine.connect() as conn:
+                trans = conn.begin()
+                try:
+                    clear_tables(conn)
+                    for name, table_name in TABLE_PLAN:
+                        start = time.perf_counter()
+                        rows, used = load_table(conn, name, table_name, resolve_format(name, args.format), engine_mode)
+                        seconds = time.perf_counter() - start
+                        results.append((table_name, used, rows, seconds))
+                        print(f"  {table_name:<20} {used:<10} {rows:>9,} rows  {seconds:7.2f}s  "
+                              f"{rows / max(seconds, 1e-9):>10,.0f} rows/sec")
+                finally:
+                    trans.rollback()
+    finally:
+        engine.dispose()
+
+    print("\nTotals:")
+    for used in ("LOAD DATA", "to_sql"):
+        rows = sum(r[2] for r in results if r[1] == used)
+        seconds = sum(r[3] for r in results if r[1] == used)
+        if seconds:
+            print(f"  {used:<10} {rows:>9,} rows  {seconds:7.2f}s  {rows / seconds:>10,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
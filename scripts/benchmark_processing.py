@@ -0,0 +1,137 @@
+"""
+Processing Benchmark
+Compares the old iterrows-based packaging/contact extraction with the
+vectorized version in process_data.py on a synthetic dataset.
+
+Usage:
+    python scripts/benchmark_processing.py --packages 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from process_data import clean_key_column, extract_contacts, extract_packaging  # noqa: E402
+
+
+# ============================================
+# Previous implementations (kept here for comparison only)
+# ============================================
+
+def extract_packaging_iterrows(df_ndc: pd.DataFrame) -> pd.DataFrame:
+    packaging_records = []
+    for _, row in df_ndc.iterrows():
+        product_ndc = row.get('product_ndc')
+        if product_ndc is not None:
+            product_ndc = str(product_ndc).strip()
+
+        packaging_list = row.get("packaging", [])
+        if isinstance(packaging_list, list):
+            for pkg in packaging_list:
+                packaging_records.append({
+                    'product_ndc': product_ndc,
+                    'package_ndc': pkg.get('package_ndc'),
+                    'description': pkg.get('description'),
+                    'marketing_start_date': pkg.get('marketing_start_date')
+                })
+
+    ndc_packaging = pd.DataFrame(packaging_records)
+    if "package_ndc" in ndc_packaging.columns:
+        ndc_packaging = clean_key_column(ndc_packaging, "package_ndc")
+    if "product_ndc" in ndc_packaging.columns:
+        ndc_packaging["product_ndc"] = ndc_packaging["product_ndc"].astype(str).str.strip()
+    return ndc_packaging
+
+
+def extract_contacts_iterrows(df_shortages: pd.DataFrame) -> pd.DataFrame:
+    contact_records = []
+    for _, row in df_shortages.iterrows():
+        package_ndc = row.get('package_ndc')
+        if package_ndc is not None:
+            package_ndc = str(package_ndc).strip()
+
+        contact_info = row.get('contact_info')
+        if contact_info:
+            contact_records.append({
+                'package_ndc': package_ndc,
+                'contact_info': str(contact_info)
+            })
+    return pd.DataFrame(contact_records, columns=["package_ndc", "contact_info"])
+
+
+# ============================================
+# Synthetic data
+# ============================================
+
+def make_ndc(total_packages: int, seed: int = 507) -> pd.DataFrame:
+    """Products with 1-5 packages each (about 3 on average, like the real NDC file)."""
+    rng = random.Random(seed)
+    records = []
+    made = 0
+    i = 0
+    while made < total_packages:
+        count = min(rng.randint(1, 5), total_packages - made)
+        records.append({
+            "product_ndc": f" {i:05d}-{i % 997:03d} ",
+            "generic_name": "SYNTHETIC",
+            "packaging": [
+                {
+                    "package_ndc": f"{i:05d}-{i % 997:03d}-{j:02d}",
+                    "description": f"{j + 1} VIAL in 1 CARTON",
+                    "marketing_start_date": "20200101",
+                }
+                for j in range(count)
+            ],
+        })
+        made += count
+        i += 1
+    return pd.DataFrame(records)
+
+
+def make_shortages(rows: int, seed: int = 507) -> pd.DataFrame:
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "package_ndc": [f"{i:05d}-{i % 997:03d}-00 " for i in range(rows)],
+        "contact_info": [rng.choice(["Call 1-800-000-0000", "", None]) for _ in range(rows)],
+    })
+
+
+def timed(label: str, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+    print(f"  {label:<12} {seconds:8.2f}s  ({len(result):,} rows)")
+    return result, seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark packaging/contact extraction")
+    parser.add_argument("--packages", type=int, default=1_000_000, help="synthetic packages (default 1M)")
+    parser.add_argument("--shortages", type=int, default=100_000, help="synthetic shortage rows")
+    args = parser.parse_args()
+
+    print(f"Building synthetic NDC data with {args.packages:,} packages...")
+    df_ndc = make_ndc(args.packages)
+    print(f"  {len(df_ndc):,} products")
+
+    print("\nPackaging extraction:")
+    old, old_s = timed("iterrows", extract_packaging_iterrows, df_ndc)
+    new, new_s = timed("vectorized", extract_packaging, df_ndc)
+    same = old.to_csv(index=False) == new.to_csv(index=False)
+    print(f"  speedup: {old_s / max(new_s, 1e-9):.1f}x, identical CSV: {same}")
+
+    print(f"\nContact extraction ({args.shortages:,} shortages):")
+    df_shortages = make_shortages(args.shortages)
+    old, old_s = timed("iterrows", extract_contacts_iterrows, df_shortages)
+    new, new_s = timed("vectorized", extract_contacts, df_shortages)
+    same = old.to_csv(index=False) == new.to_csv(index=False)
+    print(f"  speedup: {old_s / max(new_s, 1e-9):.1f}x, identical CSV: {same}")
+
+
+if __name__ == "__main__":
+    main()
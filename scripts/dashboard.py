@@ -3,11 +3,16 @@ FDA Drug Shortage Analysis Dashboard
 Interactive dashboard displaying shortage metrics and insights
 """
 
+import os
+import sys
+
 import streamlit as st
-import pandas as pd
-from sqlalchemy import create_engine
 import plotly.express as px
-import plotly.graph_objects as go
+
+# Shared data access lives with the main dashboard
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dashboard"))
+
+from data_access import Filters, get_shortage_data  # noqa: E402
 
 # ============================================
 # Page Configuration
@@ -20,131 +25,7 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# ============================================
-# Database Connection
-# ============================================
-
-@st.cache_resource
-def get_database_connection():
-    """Create cached database connection"""
-    
-    # Database credentials - UPDATE THESE
-    DB_USER = 'root'
-    DB_PASSWORD = 'your_password'  # CHANGE THIS!
-    DB_HOST = 'localhost'
-    DB_PORT = '3306'
-    DB_NAME = 'fda_shortage_db'
-    
-    connection_string = f'mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
-    
-    try:
-        engine = create_engine(connection_string)
-        return engine
-    except Exception as e:
-        st.error(f"Database connection error: {e}")
-        st.stop()
-
-# ============================================
-# Data Loading Functions
-# ============================================
-
-@st.cache_data(ttl=600)
-def load_manufacturer_risk(_engine):
-    """Load top manufacturers by current shortage risk"""
-    query = """
-    SELECT 
-        company_name,
-        current_affected_packages,
-        current_affected_products
-    FROM current_manufacturer_risk
-    LIMIT 15
-    """
-    return pd.read_sql(query, _engine)
-
-@st.cache_data(ttl=600)
-def load_shortage_overview(_engine):
-    """Load overall shortage statistics"""
-    query = """
-    SELECT 
-        COUNT(*) as total_shortages,
-        COUNT(DISTINCT company_name) as affected_manufacturers,
-        COUNT(DISTINCT product_ndc) as affected_products,
-        SUM(CASE WHEN status = 'Current' THEN 1 ELSE 0 END) as current_shortages
-    FROM shortages_with_ndc
-    """
-    return pd.read_sql(query, _engine)
-
-@st.cache_data(ttl=600)
-def load_brand_vs_generic(_engine):
-    """Load brand name vs generic comparison"""
-    query = """
-    SELECT 
-        CASE 
-            WHEN brand_name IS NOT NULL AND brand_name != '' THEN 'Branded Drug'
-            ELSE 'Generic/Unbranded'
-        END AS drug_type,
-        COUNT(*) AS shortage_count
-    FROM shortages_with_ndc
-    WHERE status = 'Current'
-    GROUP BY drug_type
-    """
-    return pd.read_sql(query, _engine)
-
-@st.cache_data(ttl=600)
-def load_route_analysis(_engine):
-    """Load shortage analysis by route of administration"""
-    query = """
-    SELECT 
-        CASE 
-            WHEN route LIKE '%ORAL%' THEN 'Oral'
-            WHEN route LIKE '%INTRAVENOUS%' OR route LIKE '%IV%' THEN 'Intravenous'
-            WHEN route LIKE '%INJECTION%' THEN 'Injection'
-            WHEN route LIKE '%TOPICAL%' THEN 'Topical'
-            WHEN route LIKE '%INHALATION%' THEN 'Inhalation'
-            ELSE 'Other'
-        END AS administration_route,
-        COUNT(*) AS shortage_count
-    FROM shortages_with_ndc
-    WHERE status = 'Current' AND route IS NOT NULL
-    GROUP BY administration_route
-    ORDER BY shortage_count DESC
-    LIMIT 10
-    """
-    return pd.read_sql(query, _engine)
-
-@st.cache_data(ttl=600)
-def load_product_type_analysis(_engine):
-    """Load shortage analysis by product type"""
-    query = """
-    SELECT 
-        product_type,
-        COUNT(*) AS shortage_count,
-        COUNT(DISTINCT company_name) AS manufacturers
-    FROM shortages_with_ndc
-    WHERE status = 'Current' AND product_type IS NOT NULL
-    GROUP BY product_type
-    ORDER BY shortage_count DESC
-    """
-    return pd.read_sql(query, _engine)
-
-@st.cache_data(ttl=600)
-def load_detailed_shortages(_engine, limit=50):
-    """Load detailed shortage list"""
-    query = f"""
-    SELECT 
-        company_name AS manufacturer,
-        shortage_generic_name AS drug_name,
-        brand_name,
-        shortage_dosage_form AS dosage_form,
-        package_description,
-        product_type,
-        DATEDIFF(CURDATE(), STR_TO_DATE(initial_posting_date, '%Y%m%d')) AS days_active
-    FROM shortages_with_ndc
-    WHERE status = 'Current' AND product_ndc IS NOT NULL
-    ORDER BY days_active DESC
-    LIMIT {limit}
-    """
-    return pd.read_sql(query, _engine)
+CURRENT = Filters(only_current=True)
 
 # ============================================
 # Dashboard Layout
@@ -159,8 +40,9 @@ def main():
     with drug shortage data to reveal insights not possible from either dataset alone.
     """)
     
-    # Get database connection
-    engine = get_database_connection()
+    # Shared engine, cache and snapshot (DB_* environment variables)
+    data = get_shortage_data()
+    data.sync()
     
     # Sidebar filters
     st.sidebar.header("Dashboard Controls")
@@ -168,7 +50,7 @@ def main():
     refresh_button = st.sidebar.button("🔄 Refresh Data", use_container_width=True)
     
     if refresh_button:
-        st.cache_data.clear()
+        data.refresh()
         st.rerun()
     
     st.sidebar.markdown("---")
@@ -179,6 +61,7 @@ def main():
     
     **Last Updated:** Real-time
     """)
+    st.sidebar.caption(data.status())
     
     # ============================================
     # Key Metrics Row
@@ -186,32 +69,32 @@ def main():
     
     st.header("📊 Key Metrics")
     
-    overview = load_shortage_overview(engine)
+    overview = data.overview()
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         st.metric(
             label="Total Shortages",
-            value=f"{overview['total_shortages'].iloc[0]:,}"
+            value=f"{int(overview['total_shortages']):,}"
         )
     
     with col2:
         st.metric(
             label="Current Shortages",
-            value=f"{overview['current_shortages'].iloc[0]:,}"
+            value=f"{int(overview['current_shortages']):,}"
         )
     
     with col3:
         st.metric(
             label="Affected Manufacturers",
-            value=f"{overview['affected_manufacturers'].iloc[0]:,}"
+            value=f"{int(overview['affected_manufacturers']):,}"
         )
     
     with col4:
         st.metric(
             label="Affected Products",
-            value=f"{overview['affected_products'].iloc[0]:,}"
+            value=f"{int(overview['affected_products']):,}"
         )
     
     st.markdown("---")
@@ -222,7 +105,7 @@ def main():
     
     st.header("🏭 Top Manufacturers by Shortage Risk")
     
-    manufacturer_data = load_manufacturer_risk(engine)
+    manufacturer_data = data.manufacturer_risk(limit=15)
     
     col1, col2 = st.columns([2, 1])
     
@@ -256,7 +139,7 @@ def main():
     
     st.header("💊 Brand Name vs Generic Drug Shortages")
     
-    brand_data = load_brand_vs_generic(engine)
+    brand_data = data.brand_vs_generic(CURRENT)
     
     col1, col2 = st.columns(2)
     
@@ -275,7 +158,7 @@ def main():
         st.markdown("### Key Insight")
         if len(brand_data) > 0:
             total = brand_data['shortage_count'].sum()
-            branded = brand_data[brand_data['drug_type'] == 'Branded Drug']['shortage_count'].iloc[0] if 'Branded Drug' in brand_data['drug_type'].values else 0
+            branded = brand_data[brand_data['drug_type'] == 'Branded']['shortage_count'].iloc[0] if 'Branded' in brand_data['drug_type'].values else 0
             generic = brand_data[brand_data['drug_type'] == 'Generic/Unbranded']['shortage_count'].iloc[0] if 'Generic/Unbranded' in brand_data['drug_type'].values else 0
             
             branded_pct = (branded / total * 100) if total > 0 else 0
@@ -298,7 +181,7 @@ def main():
     
     st.header("💉 Shortages by Route of Administration")
     
-    route_data = load_route_analysis(engine)
+    route_data = data.route_groups(CURRENT, limit=10)
     
     fig = px.bar(
         route_data,
@@ -325,7 +208,7 @@ def main():
     
     st.header("📋 Prescription vs OTC Drug Shortages")
     
-    product_type_data = load_product_type_analysis(engine)
+    product_type_data = data.product_types(CURRENT)
     
     col1, col2 = st.columns([2, 1])
     
@@ -358,7 +241,7 @@ def main():
     
     num_records = st.slider("Number of records to display:", 10, 100, 50, 10)
     
-    detailed_data = load_detailed_shortages(engine, num_records)
+    detailed_data = data.longest_active(CURRENT, limit=num_records)
     
     st.dataframe(
         detailed_data,
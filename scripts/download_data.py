@@ -3,62 +3,360 @@ FDA Data Download Script
 Downloads NDC and Drug Shortage datasets from FDA's official sources
 """
 
-import pandas as pd
-import requests
-import zipfile
-import io
+import argparse
+import hashlib
 import json
 import os
+import shutil
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+
+# Streaming settings: the archive is written to disk in chunks so memory
+# use stays flat no matter how large the openFDA file gets.
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+PROGRESS_EVERY = 10 * 1024 * 1024  # print progress every 10 MB
+
+# Download cache: ETag, Last-Modified, size and checksum for each archive,
+# so unchanged archives are skipped and interrupted ones are resumed.
+CACHE_PATH = os.path.join("data", "download_cache.json")
+
+# Per-archive results of the last run (bytes and seconds), read by run_pipeline.py
+DOWNLOAD_METRICS_JSON = os.path.join("data", "download_metrics.json")
+
+# Base URL can be pointed at a local stand-in server for testing
+OPENFDA_HOST = "https://download.open.fda.gov"
+BASE_URL = os.getenv("FDA_DOWNLOAD_BASE_URL", OPENFDA_HOST).rstrip("/")
+
+# openFDA manifest listing every partition (drug-ndc-000N-of-000M) per dataset;
+# with a stand-in base URL it is read from the same server (BASE_URL/download.json)
+OPENFDA_MANIFEST_URL = "https://api.fda.gov/download.json"
+MANIFEST_URL = os.getenv(
+    "FDA_DOWNLOAD_MANIFEST_URL",
+    OPENFDA_MANIFEST_URL if BASE_URL == OPENFDA_HOST else f"{BASE_URL}/download.json",
+)
+
+# (label, openFDA dataset key) pairs and the archives used when the manifest is unavailable
+DATASETS = [("NDC", "ndc"), ("Drug Shortages", "shortages")]
+DEFAULT_ARCHIVES = {
+    "ndc": ["drug/ndc/drug-ndc-0001-of-0001.json.zip"],
+    "shortages": ["drug/shortages/drug-shortages-0001-of-0001.json.zip"],
+}
+
+# downloads run in parallel threads that share one cache file
+_cache_lock = threading.Lock()
+
+
+def format_bytes(num_bytes: float) -> str:
+    """Human readable byte count (e.g. 118.6 MB)."""
+    for unit in ["B", "KB", "MB", "GB"]:
+        if num_bytes < 1024 or unit == "GB":
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
+
+
+def stream_to_file(response, out_file, hasher=None, already: int = 0, total: int = 0,
+                   label: str = "") -> int:
+    """
+    Write a streaming response into an open binary file in chunks.
+    Prints progress and throughput, returns the number of bytes written.
+    already is the size of a partial file being resumed, label prefixes the
+    progress lines so parallel downloads can be told apart.
+    """
+    prefix = f"[{label}] " if label else ""
+    start = time.perf_counter()
+    written = 0
+    next_report = PROGRESS_EVERY
+
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        if not chunk:
+            continue
+        out_file.write(chunk)
+        if hasher is not None:
+            hasher.update(chunk)
+        written += len(chunk)
+
+        if written >= next_report:
+            elapsed = max(time.perf_counter() - start, 1e-6)
+            done = already + written
+            pct = f" ({done * 100 / total:.0f}%)" if total else ""
+            print(f"   {prefix}{format_bytes(done)}{pct} at {format_bytes(written / elapsed)}/s")
+            next_report += PROGRESS_EVERY
+
+    elapsed = max(time.perf_counter() - start, 1e-6)
+    print(f"   {prefix}Downloaded {format_bytes(written)} in {elapsed:.1f}s ({format_bytes(written / elapsed)}/s)")
+    return written
+
+
+def load_cache(path: str = CACHE_PATH) -> dict:
+    """Read the download cache (archive name -> metadata). Missing file means empty cache."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_cache(cache: dict, path: str = CACHE_PATH) -> None:
+    """Write the download cache atomically so a crash never leaves half a file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with _cache_lock:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+
+def file_sha256(path: str):
+    """Hash an existing file in chunks (used to continue hashing a resumed download)."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher
+
+
+def extract_zip(zip_path: str, dest_dir: str) -> list[str]:
+    """
+    Extract every member of a zip file into dest_dir one at a time.
+    Each member is copied in chunks so the decompressed JSON is never
+    held in memory.
+    """
+    extracted = []
+    dest_root = os.path.realpath(dest_dir)
+
+    with zipfile.ZipFile(zip_path) as z:
+        for member in z.infolist():
+            if member.is_dir():
+                continue
+
+            target = os.path.realpath(os.path.join(dest_dir, member.filename))
+            # guard against zip entries that try to escape data/
+            if not target.startswith(dest_root + os.sep):
+                raise ValueError(f"Unsafe path in archive: {member.filename}")
+
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with z.open(member) as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            extracted.append(os.path.normpath(os.path.join(dest_dir, member.filename)))
+
+    return extracted
+
+
+def download_and_extract(url: str, dest_dir: str = "data", cache: dict | None = None,
+                         cache_path: str = CACHE_PATH) -> dict:
+    """
+    Download a zip archive and extract it into dest_dir, using the download cache.
+
+    - If the archive was fully downloaded before and its extracted files still
+      exist, a conditional request (If-None-Match / If-Modified-Since) is sent
+      and a 304 response skips the download entirely.
+    - If a previous download was interrupted, the partial file is resumed with
+      an HTTP Range request (If-Range makes the server send the full file
+      again if the archive changed in the meantime).
+
+    Returns the cache entry for the archive.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    if cache is None:
+        cache = load_cache(cache_path)
+
+    name = url.rsplit("/", 1)[-1]
+    part_path = os.path.join(dest_dir, name + ".part")
+    entry = cache.get(name, {})
+    validator = entry.get("etag") or entry.get("last_modified")
+
+    headers = {}
+    offset = 0
+    files_present = bool(entry.get("files")) and all(os.path.exists(f) for f in entry["files"])
+
+    if entry.get("complete") and files_present:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    elif os.path.exists(part_path) and validator and entry.get("url") == url:
+        offset = os.path.getsize(part_path)
+
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = validator
+
+    with requests.get(url, stream=True, timeout=60, headers=headers) as response:
+        if response.status_code == 304:
+            print(f"   [{name}] Not modified since last run, skipping download.")
+            return {**entry, "bytes_downloaded": 0}
+
+        response.raise_for_status()
+
+        if response.status_code == 206 and offset:
+            print(f"   [{name}] Resuming download at {format_bytes(offset)}...")
+            mode = "ab"
+            hasher = file_sha256(part_path)
+        else:
+            offset = 0
+            mode = "wb"
+            hasher = hashlib.sha256()
+
+        remaining = int(response.headers.get("Content-Length", 0))
+        total = offset + remaining if remaining else 0
+
+        # Record validators before streaming so an interrupted download can resume
+        entry = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "size": total or None,
+            "complete": False,
+        }
+        with _cache_lock:
+            cache[name] = entry
+        save_cache(cache, cache_path)
+
+        with open(part_path, mode) as out_file:
+            written = stream_to_file(response, out_file, hasher, already=offset, total=total, label=name)
+
+    size = os.path.getsize(part_path)
+    if total and size != total:
+        raise IOError(f"Incomplete download for {name}: got {size} of {total} bytes")
+
+    print(f"   [{name}] Download complete. Extracting...")
+    files = extract_zip(part_path, dest_dir)
+    os.remove(part_path)
+
+    with _cache_lock:
+        entry.update({
+            "size": size,
+            "sha256": hasher.hexdigest(),
+            "files": files,
+            "complete": True,
+            "downloaded_at": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        })
+    save_cache(cache, cache_path)
+
+    return {**entry, "bytes_downloaded": written}
+
+
+def list_partitions(dataset: str, manifest: dict | None) -> list[str]:
+    """
+    Return the archive URLs for a dataset ("ndc" or "shortages").
+    openFDA splits large datasets into drug-ndc-000N-of-000M partitions, so the
+    list comes from the download manifest when it is available.
+    """
+    if manifest:
+        try:
+            partitions = manifest["results"]["drug"][dataset]["partitions"]
+            urls = [part["file"].replace(OPENFDA_HOST, BASE_URL, 1) for part in partitions]
+            if urls:
+                return urls
+        except (KeyError, TypeError):
+            pass
+    return [f"{BASE_URL}/{path}" for path in DEFAULT_ARCHIVES[dataset]]
+
+
+def fetch_manifest() -> dict | None:
+    """Download the openFDA download manifest, or None if it is unavailable."""
+    try:
+        response = requests.get(MANIFEST_URL, timeout=30)
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        print(f"   Could not read download manifest ({e}), using default archive list")
+        return None
+
+
+def download_one(label: str, url: str, dest_dir: str, cache: dict, cache_path: str) -> dict:
+    """Download a single archive and return a timing record (never raises)."""
+    name = url.rsplit("/", 1)[-1]
+    print(f"   [{label}] {name}: starting")
+    start = time.perf_counter()
+    try:
+        entry = download_and_extract(url, dest_dir, cache, cache_path)
+        status = "skipped" if entry["bytes_downloaded"] == 0 else "downloaded"
+        error = None
+        bytes_downloaded = entry["bytes_downloaded"]
+    except Exception as e:
+        status = "failed"
+        error = str(e)
+        bytes_downloaded = 0
+    seconds = time.perf_counter() - start
+
+    if error:
+        print(f"   ✗ [{label}] {name}: {error}")
+    else:
+        print(f"   ✓ [{label}] {name}: {status} in {seconds:.1f}s")
+
+    return {
+        "dataset": label,
+        "archive": name,
+        "status": status,
+        "seconds": round(seconds, 2),
+        "bytes": bytes_downloaded,
+        "error": error,
+    }
+
+
+def download_all(dest_dir: str = "data", workers: int = 4, sequential: bool = False) -> list[dict]:
+    """
+    Download and extract every partition of the NDC and shortage datasets.
+    By default the transfers run in a thread pool, so total time is close to
+    the slowest archive rather than the sum of all of them.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    cache_path = os.path.join(dest_dir, os.path.basename(CACHE_PATH))
+    cache = load_cache(cache_path)
+
+    manifest = fetch_manifest()
+    jobs = [
+        (label, url)
+        for label, dataset in DATASETS
+        for url in list_partitions(dataset, manifest)
+    ]
+
+    if sequential or workers <= 1:
+        return [download_one(label, url, dest_dir, cache, cache_path) for label, url in jobs]
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = [
+            pool.submit(download_one, label, url, dest_dir, cache, cache_path)
+            for label, url in jobs
+        ]
+        # keep results in job order so the summary is deterministic
+        return [f.result() for f in futures]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Download openFDA NDC and drug shortage archives")
+    parser.add_argument("--sequential", action="store_true", help="download one archive at a time")
+    parser.add_argument("--workers", type=int, default=4, help="parallel downloads (default 4)")
+    args = parser.parse_args()
+
+    print("Starting FDA data download...")
+    start = time.perf_counter()
+
+    results = download_all("data", workers=args.workers, sequential=args.sequential)
+
+    total = time.perf_counter() - start
+    print("\nPer-file timing:")
+    for r in results:
+        print(f"  {r['archive']:<45} {r['status']:<10} {r['seconds']:>7.1f}s  {format_bytes(r['bytes'])}")
+    print(f"  Total wall time: {total:.1f}s (sum of transfers: {sum(r['seconds'] for r in results):.1f}s)")
+
+    with open(DOWNLOAD_METRICS_JSON, "w", encoding="utf-8") as f:
+        json.dump({"bytes": sum(r["bytes"] for r in results), "seconds": round(total, 2),
+                   "archives": results}, f, indent=2)
+
+    if any(r["status"] == "failed" for r in results):
+        print("\n✗ Some downloads failed, see errors above.")
+    else:
+        print("\n✓ All downloads complete!")
+    print("\nNext step: Run process_data.py to clean and prepare the data for MySQL")
+
 
-print("Starting FDA data download...")
-
-# Create data directory if it doesn't exist
-os.makedirs('data', exist_ok=True)
-
-# ============================================
-# Download NDC Dataset
-# ============================================
-print("\n1. Downloading NDC dataset (this may take a few minutes, ~119MB)...")
-
-ndc_url = "https://download.open.fda.gov/drug/ndc/drug-ndc-0001-of-0001.json.zip"
-
-try:
-    response = requests.get(ndc_url)
-    response.raise_for_status()
-    
-    print("   Download complete. Extracting...")
-    
-    # Extract zip file
-    zip_bytes = io.BytesIO(response.content)
-    with zipfile.ZipFile(zip_bytes) as z:
-        z.extractall("data")
-    
-    print("   ✓ NDC dataset downloaded and extracted to data/")
-    
-except Exception as e:
-    print(f"   ✗ Error downloading NDC dataset: {e}")
-
-# ============================================
-# Download Drug Shortages Dataset
-# ============================================
-print("\n2. Downloading Drug Shortages dataset...")
-
-shortages_url = "https://download.open.fda.gov/drug/shortages/drug-shortages-0001-of-0001.json.zip"
-try:
-    response = requests.get(shortages_url)
-    response.raise_for_status()
-    
-    print("   Download complete. Extracting...")
-    
-    # Extract zip file
-    zip_bytes = io.BytesIO(response.content)
-    with zipfile.ZipFile(zip_bytes) as z:
-        z.extractall("data")
-    
-    print("   ✓ Drug Shortages dataset downloaded and extracted to data/")
-    
-except Exception as e:
-    print(f"   ✗ Error downloading Drug Shortages dataset: {e}")
-
-print("\n✓ All downloads complete!")
-print("\nNext step: Run process_data.py to clean and prepare the data for MySQL")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Load Scheduler
+Works out which tables can be loaded in parallel from the foreign keys
+declared in sql/01_create_tables.sql.
+
+Tables connected by a foreign key form one load group: the group is loaded
+on a single connection with parents before children (and cleared children
+first). Separate groups share no keys and can run concurrently.
+"""
+
+import re
+from pathlib import Path
+
+SCHEMA_SQL = "sql/01_create_tables.sql"
+
+CREATE_STATEMENT_RE = re.compile(
+    r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\(.*?;",
+    re.IGNORECASE | re.DOTALL,
+)
+CREATE_TABLE_RE = re.compile(
+    r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\((.*?)\)\s*ENGINE",
+    re.IGNORECASE | re.DOTALL,
+)
+FOREIGN_KEY_RE = re.compile(r"FOREIGN\s+KEY\s*\([^)]*\)\s*REFERENCES\s+`?(\w+)`?", re.IGNORECASE)
+
+
+def read_schema(schema_path: str = SCHEMA_SQL) -> str:
+    """Schema file text without line comments (so commented-out DDL is ignored)."""
+    sql_text = Path(schema_path).read_text(encoding="utf-8")
+    return re.sub(r"--[^\n]*", "", sql_text)
+
+
+def parse_fk_graph(schema_path: str = SCHEMA_SQL) -> dict[str, set[str]]:
+    """Map every table in the schema file to the set of tables it references."""
+    sql_text = read_schema(schema_path)
+
+    graph: dict[str, set[str]] = {}
+    for table, body in CREATE_TABLE_RE.findall(sql_text):
+        graph[table] = {parent for parent in FOREIGN_KEY_RE.findall(body) if parent != table}
+    return graph
+
+
+def topological_order(tables: list[str], graph: dict[str, set[str]]) -> list[str]:
+    """Order tables so every parent comes before its children (ties keep input order)."""
+    remaining = list(tables)
+    ordered: list[str] = []
+    while remaining:
+        ready = [t for t in remaining if not (graph.get(t, set()) & set(remaining))]
+        if not ready:
+            raise ValueError(f"Foreign key cycle between tables: {', '.join(remaining)}")
+        ordered.extend(ready)
+        remaining = [t for t in remaining if t not in ready]
+    return ordered
+
+
+def plan_load_groups(tables: list[str], graph: dict[str, set[str]]) -> list[list[str]]:
+    """
+    Split the tables to load into independent groups (connected by foreign
+    keys) and order each group parents-first.
+
+    >>> g = {"raw_ndc": set(), "raw_ndc_packaging": {"raw_ndc"},
+    ...      "raw_drug_shortages": set(), "shortage_contacts": {"raw_drug_shortages"}}
+    >>> plan_load_groups(list(g), g)
+    [['raw_ndc', 'raw_ndc_packaging'], ['raw_drug_shortages', 'shortage_contacts']]
+    """
+    wanted = set(tables)
+    group_of = {t: {t} for t in tables}
+
+    for child in tables:
+        for parent in graph.get(child, set()) & wanted:
+            merged = group_of[child] | group_of[parent]
+            for t in merged:
+                group_of[t] = merged
+
+    groups: list[list[str]] = []
+    seen: set[str] = set()
+    for t in tables:
+        if t in seen:
+            continue
+        members = [m for m in tables if m in group_of[t]]
+        seen.update(members)
+        groups.append(topological_order(members, graph))
+    return groups
+
+
+def staging_ddl(tables: list[str], suffix: str = "_staging", schema_path: str = SCHEMA_SQL) -> dict[str, str]:
+    """
+    CREATE TABLE statements for `<table><suffix>` copies of the given tables,
+    taken from the schema file. Foreign keys between the copied tables point
+    at the other copies, so after a RENAME swap they reference the live tables.
+    """
+    sql_text = read_schema(schema_path)
+    statements = {m.group(1): m.group(0) for m in CREATE_STATEMENT_RE.finditer(sql_text)}
+
+    ddl = {}
+    for table in tables:
+        if table not in statements:
+            raise ValueError(f"No CREATE TABLE for {table} in {schema_path}")
+        stmt = re.sub(
+            rf"(CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?){table}\b",
+            rf"\g<1>{table}{suffix}",
+            statements[table],
+            count=1,
+            flags=re.IGNORECASE,
+        )
+        for parent in tables:
+            stmt = re.sub(rf"(REFERENCES\s+`?){parent}\b", rf"\g<1>{parent}{suffix}", stmt, flags=re.IGNORECASE)
+        ddl[table] = stmt.rstrip(";")
+    return ddl
@@ -1,13 +1,60 @@
 """
 Load Processed Data to MySQL
-Loads cleaned CSV files into MySQL database tables
+Loads cleaned CSV (or Parquet) files into MySQL database tables
 """
 
+import argparse
+import csv
+import json
 import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, create_engine, text
+
+from load_scheduler import parse_fk_graph, plan_load_groups, staging_ddl
+from table_formats import TABLE_SCHEMAS, read_table, resolve_format, table_path
+
+# MySQL table -> processed file it is loaded from
+TABLE_SOURCES = {
+    "raw_ndc": "ndc_core",
+    "raw_ndc_packaging": "ndc_packaging",
+    "raw_drug_shortages": "drug_shortages_core",
+    "shortage_contacts": "shortage_contacts",
+}
+
+# Swap mode loads into <table>_staging, then renames live tables to <table>_old
+STAGING_SUFFIX = "_staging"
+OLD_SUFFIX = "_old"
+
+# Tables whose changes feed transform_change_log (read by run_transformations.py):
+# table -> (row key, columns compared between loads, change-log column to fill)
+CHANGE_TRACKING = {
+    "raw_ndc": ("product_ndc", [c for c, _ in TABLE_SCHEMAS["ndc_core"]], "product_ndc"),
+    "raw_ndc_packaging": ("package_ndc", [c for c, _ in TABLE_SCHEMAS["ndc_packaging"]], "package_ndc"),
+    "raw_drug_shortages": ("shortage_key", ["package_ndc", "row_hash"], "package_ndc"),
+}
+
+# Delete mode: attempts to finish a prepared XA transaction whose COMMIT failed
+XA_COMMIT_RETRIES = 3
+XA_RETRY_DELAY_SECONDS = 2
+
+# Incremental mode: rows per INSERT ... ON DUPLICATE KEY UPDATE / DELETE batch
+DELTA_CHUNK_SIZE = 1000
+
+# Read by monitoring/run_monitoring.py --changed-only
+LOAD_CHANGES_JSON = "data/load_changes.json"
+
+# Strings pandas.read_csv turns into NaN by default; the bulk path maps the
+# same values to NULL so both load engines store identical rows.
+CSV_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+]
 
 
 print("Starting data load to MySQL...")
@@ -21,7 +68,8 @@ def get_engine():
     db = os.getenv("DB_NAME", "fda_shortage_db")
 
     conn_str = f"mysql+mysqlconnector://{user}:{password}@{host}:{port}/{db}"
-    return create_engine(conn_str, pool_pre_ping=True)
+    # allow_local_infile lets the client send files for LOAD DATA LOCAL INFILE
+    return create_engine(conn_str, pool_pre_ping=True, connect_args={"allow_local_infile": True})
 
 
 def require_file(path):
@@ -49,9 +97,9 @@ def clear_tables(conn):
     conn.execute(text("SET FOREIGN_KEY_CHECKS = 1;"))
 
 
-def load_csv(conn, csv_path: str, table_name: str) -> int:
-    """Read a CSV and append rows into an existing MySQL table."""
-    df = pd.read_csv(csv_path)
+def load_csv(conn, name: str, table_name: str, fmt: str = "auto") -> int:
+    """Read a processed table (CSV or Parquet) and append rows into an existing MySQL table."""
+    df = read_table(name, fmt)
     df.to_sql(
         name=table_name,
         con=conn,
@@ -62,12 +110,112 @@ def load_csv(conn, csv_path: str, table_name: str) -> int:
     )
     return len(df)
 
-def load_shortage_contacts(conn, csv_path: str) -> int:
+def local_infile_enabled(conn) -> bool:
+    """True when the server accepts LOAD DATA LOCAL INFILE."""
+    try:
+        return bool(int(conn.exec_driver_sql("SELECT @@GLOBAL.local_infile").scalar()))
+    except Exception:
+        return False
+
+
+def bulk_load_csv(conn, csv_path: str, name: str, table_name: str) -> int:
+    """
+    Stream a CSV into an existing MySQL table with LOAD DATA LOCAL INFILE.
+
+    Columns are mapped by the CSV header. Values pandas would read as NaN
+    become NULL and True/False become 1/0 for boolean columns, so the rows
+    match what load_csv() inserts through to_sql.
+
+    LOAD DATA LOCAL behaves as if IGNORE were given: rows that break a key
+    or foreign key, or values it has to convert, only produce warnings.
+    Any warning, or a row count different from the file's, raises so the
+    caller's transaction rolls back instead of keeping a partial table.
+    """
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        first_line = f.readline()
+    header = next(csv.reader([first_line]), [])
+    if not header:
+        return 0
+
+    types = dict(TABLE_SCHEMAS.get(name, []))
+    na_list = ", ".join("'" + v.replace("'", "''") + "'" for v in CSV_NA_VALUES)
+    variables = [f"@c{i}" for i in range(len(header))]
+    assignments = []
+    for var, column in zip(variables, header):
+        if types.get(column) == "bool":
+            expr = f"CASE {var} WHEN 'True' THEN 1 WHEN 'False' THEN 0 ELSE NULL END"
+        else:
+            # binary compare so e.g. "none" stays text while "None" is NULL, like pandas
+            expr = f"IF(CAST({var} AS BINARY) IN ({na_list}), NULL, {var})"
+        assignments.append(f"`{column}` = {expr}")
+
+    line_end = "\\r\\n" if first_line.endswith("\r\n") else "\\n"
+    path = Path(csv_path).resolve().as_posix().replace("'", "''")
+
+    sql = f"""
+        LOAD DATA LOCAL INFILE '{path}'
+        INTO TABLE {table_name}
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+        LINES TERMINATED BY '{line_end}'
+        IGNORE 1 LINES
+        ({", ".join(variables)})
+        SET {", ".join(assignments)}
+    """
+    result = conn.exec_driver_sql(sql)
+    loaded = result.rowcount
+
+    warnings = [row for row in conn.exec_driver_sql("SHOW WARNINGS").fetchall() if row[0] != "Note"]
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        expected = sum(1 for _ in csv.reader(f)) - 1
+    if warnings or loaded != expected:
+        details = "; ".join(f"{level} {code}: {message}" for level, code, message in warnings[:5])
+        raise RuntimeError(
+            f"LOAD DATA into {table_name} loaded {loaded:,} of {expected:,} rows "
+            f"with {len(warnings)} warning(s){': ' + details if details else ''}"
+        )
+    return loaded
+
+
+def load_table(conn, name: str, table_name: str, fmt: str, engine_mode: str = "auto") -> tuple[int, str]:
+    """
+    Load one processed table with the bulk path when possible.
+    engine_mode: "bulk" (LOAD DATA only), "to_sql" (pandas only) or "auto"
+    (LOAD DATA, falling back to to_sql when local_infile is disabled).
+    Returns (rows, engine used).
+    """
+    if engine_mode != "to_sql":
+        if local_infile_enabled(conn):
+            if fmt == "csv":
+                return bulk_load_csv(conn, table_path(name, "csv"), name, table_name), "LOAD DATA"
+
+            # LOAD DATA needs text input: spill the Parquet table to a temporary CSV
+            fd, tmp_path = tempfile.mkstemp(suffix=".csv")
+            os.close(fd)
+            try:
+                read_table(name, fmt).to_csv(tmp_path, index=False)
+                return bulk_load_csv(conn, tmp_path, name, table_name), "LOAD DATA"
+            finally:
+                os.remove(tmp_path)
+
+        if engine_mode == "bulk":
+            raise RuntimeError("local_infile is disabled on the server, cannot use the bulk engine")
+        print("  local_infile is disabled on the server, falling back to to_sql")
+
+    return load_csv(conn, name, table_name, fmt), "to_sql"
+
+
+def load_shortage_contacts(conn, fmt: str = "auto", table_name: str = "shortage_contacts",
+                           shortages_table: str = "raw_drug_shortages", packages=None) -> int:
     """
     Convert package_ndc in CSV -> shortage_id in DB, then insert.
     Assumes shortage_contacts table has columns: shortage_id, contact_info
+    table_name / shortages_table let the swap mode target the staging copies;
+    packages limits the insert to those package_ndc values (incremental mode).
     """
-    df = pd.read_csv(csv_path)
+    df = read_table("shortage_contacts", fmt)
+    if packages is not None:
+        df = df[df["package_ndc"].astype(str).str.strip().isin(packages)]
 
     # If the file is empty, just do nothing safely
     if df.empty:
@@ -76,9 +224,9 @@ def load_shortage_contacts(conn, csv_path: str) -> int:
     # Pull mapping from DB: package_ndc -> one shortage_id
     # (We take MIN(shortage_id) for that package_ndc to keep it deterministic)
     mapping_df = pd.read_sql(
-        """
+        f"""
         SELECT package_ndc, MIN(shortage_id) AS shortage_id
-        FROM raw_drug_shortages
+        FROM {shortages_table}
         WHERE package_ndc IS NOT NULL AND package_ndc <> ''
         GROUP BY package_ndc
         """,
@@ -96,7 +244,7 @@ def load_shortage_contacts(conn, csv_path: str) -> int:
     out["shortage_id"] = out["shortage_id"].astype(int)
 
     out.to_sql(
-        name="shortage_contacts",
+        name=table_name,
         con=conn,
         if_exists="append",
         index=False,
@@ -106,48 +254,404 @@ def load_shortage_contacts(conn, csv_path: str) -> int:
     return len(out)
 
 
+def load_one(conn, table_name: str, fmt: str, engine_mode: str, suffix: str = "") -> tuple[int, str]:
+    """Load a single MySQL table (or its `<table><suffix>` copy) from its processed file."""
+    if table_name == "shortage_contacts":
+        # Contacts require mapping (package_ndc -> shortage_id)
+        return load_shortage_contacts(conn, fmt, table_name + suffix, "raw_drug_shortages" + suffix), "to_sql"
+    return load_table(conn, TABLE_SOURCES[table_name], table_name + suffix, fmt, engine_mode)
+
+
+def load_group(conn, group: list[str], formats: dict, engine_mode: str, suffix: str = "") -> list[dict]:
+    """
+    Clear and reload one group of FK-related tables on a single connection:
+    children are cleared first, then parents are loaded before children.
+    With a suffix the group is loaded into freshly created copies, which
+    need no clearing.
+    """
+    if not suffix:
+        conn.execute(text("SET FOREIGN_KEY_CHECKS = 0;"))
+        for table_name in reversed(group):
+            conn.execute(text(f"DELETE FROM {table_name};"))
+        conn.execute(text("SET FOREIGN_KEY_CHECKS = 1;"))
+
+    stats = []
+    for table_name in group:
+        fmt = formats[TABLE_SOURCES[table_name]]
+        target = table_name + suffix
+        print(f" Loading {table_path(TABLE_SOURCES[table_name], fmt)} into {target}...")
+        start = time.perf_counter()
+        rows, used = load_one(conn, table_name, fmt, engine_mode, suffix)
+        seconds = time.perf_counter() - start
+        rate = rows / seconds if seconds > 0 else 0
+        print(f" Inserted {rows:,} rows into {target} via {used} ({seconds:.1f}s, {rate:,.0f} rows/sec)")
+        stats.append({"table": table_name, "rows": rows, "engine": used, "seconds": seconds})
+
+    if not suffix:
+        # rows were replaced in place, so there is nothing to diff against
+        for table_name in group:
+            if table_name in CHANGE_TRACKING:
+                log_full_refresh(conn, table_name)
+    return stats
+
+
+def log_full_refresh(conn, source_table: str) -> None:
+    """Ask the next transformation run to rebuild every joined row."""
+    conn.execute(text("INSERT INTO transform_change_log (source_table) VALUES (:source)"),
+                 {"source": source_table})
+
+
+def log_swap_changes(conn, tables: list[str]) -> int:
+    """
+    After a swap, log every key that differs between <table> and <table>_old
+    (added, removed or with any compared column changed).
+    """
+    logged = 0
+    for table_name in tables:
+        if table_name not in CHANGE_TRACKING:
+            continue
+        key, columns, log_column = CHANGE_TRACKING[table_name]
+        old_table = table_name + OLD_SUFFIX
+        same = " AND ".join(f"o.{c} <=> n.{c}" for c in columns)
+        result = conn.execute(text(f"""
+            INSERT INTO transform_change_log (source_table, {log_column})
+            SELECT '{table_name}', n.{log_column}
+            FROM {table_name} n
+            LEFT JOIN {old_table} o ON o.{key} = n.{key}
+            WHERE o.{key} IS NULL OR NOT ({same})
+            UNION
+            SELECT '{table_name}', o.{log_column}
+            FROM {old_table} o
+            LEFT JOIN {table_name} n ON n.{key} = o.{key}
+            WHERE n.{key} IS NULL
+        """))
+        logged += result.rowcount
+    return logged
+
+
+def load_groups_concurrently(engine, groups: list[list[str]], formats: dict, engine_mode: str,
+                             workers: int) -> list[dict]:
+    """
+    Load independent table groups in parallel, one pooled connection each.
+
+    Every group runs inside an XA (two-phase) transaction. Groups are only
+    committed once all of them have been prepared, and if any group fails
+    before that, all of them are rolled back. The XA COMMITs themselves are
+    separate statements: if one fails after others succeeded, it is retried
+    on a new connection (a prepared XA transaction survives the session).
+    Groups still uncommitted after that stay PREPARED, holding their locks,
+    until an operator finishes them: XA RECOVER lists them and
+    XA COMMIT '<xid>' commits each one (the error names the xids).
+    """
+    def run_group(group):
+        conn = engine.connect()
+        xa = conn.begin_twophase()
+        try:
+            stats = load_group(conn, group, formats, engine_mode)
+            xa.prepare()
+            return group, conn, xa, stats
+        except Exception:
+            xa.rollback()
+            conn.close()
+            raise
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_group, group) for group in groups]
+        wait(futures)
+
+    prepared = [f.result() for f in futures if f.exception() is None]
+    errors = [f.exception() for f in futures if f.exception() is not None]
+
+    if errors:
+        for _, conn, xa, _ in prepared:
+            xa.rollback()
+            conn.close()
+        raise errors[0]
+
+    # every group is prepared, so the outcome is commit: keep going past failures
+    all_stats, committed, pending = [], [], []
+    for group, conn, xa, stats in prepared:
+        label = " -> ".join(group)
+        try:
+            xa.commit()
+            done = True
+        except Exception as e:
+            print(f"   ✗ XA COMMIT of {label} ({xa.xid}) failed: {e}")
+            done = False
+        finally:
+            conn.close()
+        if done or retry_xa_commit(engine, xa.xid, label):
+            committed.append(label)
+            all_stats.extend(stats)
+        else:
+            pending.append((label, xa.xid))
+
+    if pending:
+        raise RuntimeError(
+            f"Partial commit: {len(committed)} of {len(prepared)} groups committed "
+            f"({', '.join(committed) or 'none'}); still PREPARED: "
+            + ", ".join(f"{label} xid '{xid}'" for label, xid in pending)
+            + ". Check them with XA RECOVER and finish each with XA COMMIT '<xid>'."
+        )
+    return all_stats
+
+
+def retry_xa_commit(engine, xid: str, label: str) -> bool:
+    """
+    Finish a prepared XA transaction from a new connection. An xid missing
+    from XA RECOVER was already committed (the failure came after the
+    commit), so it counts as done.
+    """
+    for attempt in range(1, XA_COMMIT_RETRIES + 1):
+        time.sleep(XA_RETRY_DELAY_SECONDS)
+        try:
+            with engine.connect() as conn:
+                if xid in conn.recover_twophase():
+                    conn.commit_prepared(xid, recover=True)
+            print(f"   ✓ {label} committed on retry {attempt}")
+            return True
+        except Exception as e:
+            print(f"   ✗ XA COMMIT retry {attempt}/{XA_COMMIT_RETRIES} of {label} failed: {e}")
+    return False
+
+
+def chunked(values: list, size: int = DELTA_CHUNK_SIZE):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def apply_shortage_delta(conn, fmt: str) -> dict:
+    """
+    Incremental load of raw_drug_shortages (and its contacts).
+
+    The processed rows are compared with the loaded ones on shortage_key
+    (hash of package_ndc + initial_posting_date) and row_hash (content hash).
+    New and changed rows are upserted with INSERT ... ON DUPLICATE KEY UPDATE,
+    so existing rows keep their shortage_id; rows no longer in the release
+    are deleted (their contacts go with them through ON DELETE CASCADE).
+    Contacts are rewritten only for the affected package_ndc values.
+    """
+    df = read_table("drug_shortages_core", fmt)
+    columns = [column for column, _ in TABLE_SCHEMAS["drug_shortages_core"]]
+    df = df.reindex(columns=columns)
+
+    current = pd.read_sql("SELECT shortage_key, row_hash, package_ndc FROM raw_drug_shortages", conn)
+    if current["shortage_key"].isna().any():
+        raise RuntimeError("raw_drug_shortages has rows without shortage_key, run a full load first")
+
+    incoming = df[["shortage_key", "row_hash"]].astype(str)
+    merged = incoming.merge(current, on="shortage_key", how="outer", suffixes=("", "_db"), indicator=True)
+
+    new_keys = set(merged.loc[merged["_merge"] == "left_only", "shortage_key"])
+    changed_keys = set(merged.loc[(merged["_merge"] == "both") & (merged["row_hash"] != merged["row_hash_db"]),
+                                  "shortage_key"])
+    deleted = merged.loc[merged["_merge"] == "right_only", ["shortage_key", "package_ndc"]]
+
+    upserts = df[incoming["shortage_key"].isin(new_keys | changed_keys).to_numpy()].astype(object)
+    upserts = upserts.where(upserts.notna(), None)
+    packages = set(upserts["package_ndc"].astype(str)) | set(deleted["package_ndc"].dropna().astype(str))
+
+    # contacts of affected packages are rebuilt after the shortage rows change
+    for batch in chunked(sorted(packages)):
+        conn.execute(
+            text("""
+                DELETE sc FROM shortage_contacts sc
+                JOIN raw_drug_shortages s ON s.shortage_id = sc.shortage_id
+                WHERE s.package_ndc IN :packages
+            """).bindparams(bindparam("packages", expanding=True)),
+            {"packages": batch},
+        )
+
+    for batch in chunked(deleted["shortage_key"].tolist()):
+        conn.execute(
+            text("DELETE FROM raw_drug_shortages WHERE shortage_key IN :keys")
+            .bindparams(bindparam("keys", expanding=True)),
+            {"keys": batch},
+        )
+
+    # row alias instead of the deprecated VALUES(col) (MySQL 8.0.19+)
+    updates = ", ".join(f"{c} = new.{c}" for c in columns if c != "shortage_key")
+    upsert_sql = text(f"""
+        INSERT INTO raw_drug_shortages ({", ".join(columns)})
+        VALUES ({", ".join(":" + c for c in columns)}) AS new
+        ON DUPLICATE KEY UPDATE {updates}
+    """)
+    records = upserts.to_dict("records")
+    for batch in chunked(records):
+        conn.execute(upsert_sql, batch)
+
+    contacts = load_shortage_contacts(conn, fmt, packages=packages) if packages else 0
+
+    for batch in chunked(sorted(packages)):
+        conn.execute(
+            text("INSERT INTO transform_change_log (source_table, package_ndc) VALUES ('raw_drug_shortages', :p)"),
+            [{"p": p} for p in batch],
+        )
+
+    return {
+        "new": len(new_keys),
+        "changed": len(changed_keys),
+        "deleted": len(deleted),
+        "unchanged": len(df) - len(new_keys) - len(changed_keys),
+        "contacts": contacts,
+    }
+
+
+def bump_pipeline_version(conn) -> int:
+    """Advance the run version the dashboard uses to invalidate its query cache."""
+    conn.execute(text("""
+        INSERT INTO pipeline_version (id, version) VALUES (1, 1)
+        ON DUPLICATE KEY UPDATE version = version + 1
+    """))
+    return int(conn.execute(text("SELECT version FROM pipeline_version WHERE id = 1")).scalar())
+
+
+def drop_tables(conn, tables: list[str]) -> None:
+    """Drop tables if they exist (FK checks off so order does not matter)."""
+    if not tables:
+        return
+    conn.execute(text("SET FOREIGN_KEY_CHECKS = 0;"))
+    conn.execute(text(f"DROP TABLE IF EXISTS {', '.join(tables)};"))
+    conn.execute(text("SET FOREIGN_KEY_CHECKS = 1;"))
+
+
+def load_via_staging(engine, groups: list[list[str]], formats: dict, engine_mode: str,
+                     workers: int) -> list[dict]:
+    """
+    Load every table into an empty `<table>_staging` copy, then publish all
+    of them with one atomic RENAME TABLE and drop the previous data.
+
+    Readers keep seeing the old tables (no DELETE, no half-loaded state)
+    until the rename. Staging copies are private, so groups load in parallel
+    with plain transactions; if any group fails, the staging copies are
+    dropped and the live tables are left untouched.
+    """
+    tables = [t for group in groups for t in group]
+    staging = [t + STAGING_SUFFIX for t in tables]
+    old = [t + OLD_SUFFIX for t in tables]
+
+    # copies come from the schema file so FKs point at the other staging tables
+    with engine.connect() as conn:
+        drop_tables(conn, staging + old)
+        for stmt in staging_ddl(tables, STAGING_SUFFIX).values():
+            conn.execute(text(stmt))
+
+    def run_group(group):
+        with engine.begin() as conn:
+            return load_group(conn, group, formats, engine_mode, STAGING_SUFFIX)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            futures = [pool.submit(run_group, group) for group in groups]
+            wait(futures)
+        errors = [f.exception() for f in futures if f.exception() is not None]
+        if errors:
+            raise errors[0]
+    except Exception:
+        with engine.connect() as conn:
+            drop_tables(conn, staging)
+        raise
+
+    # One statement renames everything atomically. Each live table moves to
+    # _old first, so the staging FKs follow their parents onto the live names.
+    renames = []
+    for table_name in tables:
+        renames.append(f"{table_name} TO {table_name}{OLD_SUFFIX}")
+        renames.append(f"{table_name}{STAGING_SUFFIX} TO {table_name}")
+
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        conn.execute(text(f"RENAME TABLE {', '.join(renames)};"))
+        print(f" Swapped {len(tables)} staging tables into place ({time.perf_counter() - start:.2f}s)")
+
+    try:
+        with engine.begin() as conn:
+            print(f" Logged {log_swap_changes(conn, tables):,} changed keys for the transformations")
+    except Exception as e:
+        print(f"  Could not diff against the previous load ({e}), requesting a full rebuild")
+        with engine.begin() as conn:
+            for table_name in tables:
+                if table_name in CHANGE_TRACKING:
+                    log_full_refresh(conn, table_name)
+
+    with engine.connect() as conn:
+        drop_tables(conn, old)
+
+    return [s for f in futures for s in f.result()]
+
+
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Load processed FDA tables into MySQL")
+    parser.add_argument("--format", choices=["auto", "csv", "parquet"], default="auto",
+                        help="intermediate format to read (auto prefers an up-to-date Parquet file)")
+    parser.add_argument("--engine", choices=["auto", "bulk", "to_sql"], default="auto",
+                        help="bulk = LOAD DATA LOCAL INFILE, to_sql = pandas inserts, auto = bulk with fallback")
+    parser.add_argument("--mode", choices=["swap", "delete"], default="swap",
+                        help="swap = load staging copies then RENAME into place, delete = clear and reload in place")
+    parser.add_argument("--incremental", action="store_true",
+                        help="apply only new/changed/deleted shortages instead of reloading them")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="parallel load groups (default: one per independent group, 1 = single transaction)")
+    args = parser.parse_args()
+
     print("Starting data load to MySQL (pipeline-safe)...")
 
     # These files must exist by the time this script runs
-    csv_plan = [
-        ("data/ndc_core.csv", "raw_ndc"),
-        ("data/ndc_packaging.csv", "raw_ndc_packaging"),
-        ("data/drug_shortages_core.csv", "raw_drug_shortages"),
-        
-    ]
-    # Contacts require mapping (package_ndc -> shortage_id)
-    contacts_csv = "data/shortage_contacts.csv"
-
-    for csv_path, _ in csv_plan:
-        require_file(csv_path)
-    require_file(contacts_csv)    
+    formats = {}
+    for name in TABLE_SOURCES.values():
+        formats[name] = resolve_format(name, args.format)
+        require_file(table_path(name, formats[name]))
+
+    # Independent FK chains, e.g. raw_ndc -> raw_ndc_packaging and
+    # raw_drug_shortages -> shortage_contacts
+    groups = plan_load_groups(list(TABLE_SOURCES), parse_fk_graph())
+    delta_group = []
+    if args.incremental:
+        # the shortage group is updated in place from the delta, the rest reload as usual
+        delta_group = next(g for g in groups if "raw_drug_shortages" in g)
+        groups = [g for g in groups if g is not delta_group]
+    workers = args.workers or len(groups)
+    print(f" Load groups: {' | '.join(' -> '.join(g) for g in groups)}")
 
     engine = get_engine()
 
     try:
+        print("\nLoading processed files into MySQL tables...")
+        start = time.perf_counter()
+        if groups and args.mode == "swap":
+            load_via_staging(engine, groups, formats, args.engine, workers)
+        elif groups and workers <= 1:
+            with engine.begin() as conn:
+                for group in groups:
+                    load_group(conn, group, formats, args.engine)
+        elif groups:
+            load_groups_concurrently(engine, groups, formats, args.engine, workers)
+
+        changed = [t for group in groups for t in group]
+        if delta_group:
+            print(f" Applying shortage delta to {' -> '.join(delta_group)}...")
+            delta_start = time.perf_counter()
+            with engine.begin() as conn:
+                delta = apply_shortage_delta(conn, formats["drug_shortages_core"])
+            print(f" {delta['new']:,} new, {delta['changed']:,} changed, {delta['deleted']:,} deleted, "
+                  f"{delta['unchanged']:,} unchanged shortages; {delta['contacts']:,} contacts rewritten "
+                  f"({time.perf_counter() - delta_start:.1f}s)")
+            if delta["new"] or delta["changed"] or delta["deleted"]:
+                changed += delta_group
+        print(f" All tables committed in {time.perf_counter() - start:.1f}s")
+
         with engine.begin() as conn:
-            print(" Connected. Clearing existing rows...")
-            clear_tables(conn)
-            print(" Tables cleared.")
-
-            print("\nLoading CSV files into MySQL tables...")
-            for csv_path, table_name in csv_plan:
-                print(f" Loading {csv_path} into {table_name}...")
-                rows = load_csv(conn, csv_path, table_name)
-                print(f" Inserted {rows:,} rows into {table_name}")
-            print(f" Loading {contacts_csv} into shortage_contacts (mapping shortage_id)...")
-            rows = load_shortage_contacts(conn, contacts_csv)
-            print(f" Inserted {rows:,} rows into shortage_contacts")    
+            version = bump_pipeline_version(conn)
+        print(f" Pipeline version is now {version}")
+        with open(LOAD_CHANGES_JSON, "w", encoding="utf-8") as f:
+            json.dump({"pipeline_version": version, "tables": changed}, f, indent=2)
 
         # verification
         with engine.connect() as conn:
             print("\nRow count verification:")
-            for _, table_name in csv_plan:
+            for table_name in TABLE_SOURCES:
                 cnt = conn.execute(text(f"SELECT COUNT(*) FROM {table_name};")).scalar()
                 print(f"  {table_name}: {int(cnt):,} rows")
-            cnt = conn.execute(text("SELECT COUNT(*) FROM shortage_contacts;")).scalar()
-            print(f"  shortage_contacts: {int(cnt):,} rows")
         print("\n Data load completed successfully.")
 
     finally:
@@ -156,4 +660,4 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
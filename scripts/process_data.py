@@ -1,113 +1,437 @@
 """
 FDA Data Processing Script
-Cleans and normalizes the downloaded FDA datasets into structured CSV tables
+Cleans and normalizes the downloaded FDA datasets into structured CSV (or Parquet) tables
 """
 
-import pandas as pd
+import argparse
+import glob
 import json
 import os
 
-print("Starting data processing...")
+import numpy as np
+import pandas as pd
+
+from table_formats import FORMATS, TABLE_SCHEMAS, TableWriter, parquet_available, write_table
+
+NDC_JSON = 'data/drug-ndc-0001-of-0001.json'
+NDC_PARTITIONS = 'data/drug-ndc-*-of-*.json'
+SHORTAGES_JSON = 'data/drug-shortages-0001-of-0001.json'
+
+PACKAGING_FIELDS = ['package_ndc', 'description', 'marketing_start_date']
+
+NDC_CORE_COLUMNS = [
+    'product_ndc', 'generic_name', 'labeler_name', 'brand_name',
+    'finished', 'marketing_category', 'dosage_form', 'route',
+    'product_type', 'marketing_start_date', 'application_number'
+]
+
+# ndc_core columns written by both modes, whatever the records contain:
+# fields missing from the source are written as empty columns
+NDC_CORE_OUTPUT = [col for col in NDC_CORE_COLUMNS if col in dict(TABLE_SCHEMAS["ndc_core"])]
+
+# Natural key of a shortage listing (hashed into shortage_key for incremental loads)
+SHORTAGE_KEY_COLUMNS = ['package_ndc', 'initial_posting_date']
+
+# Date formats seen in the openFDA files, tried in this order
+DATE_FORMATS = ['%Y%m%d', '%m/%d/%Y']
+
+# Date columns parsed at process time (stored as DATE in MySQL)
+DATE_COLUMNS = {
+    'ndc_core': ['marketing_start_date'],
+    'drug_shortages_core': ['initial_posting_date', 'update_date'],
+}
+
+METRICS_JSON = 'data/process_metrics.json'
+
+# Streaming mode settings
+DEFAULT_BATCH_SIZE = 5000
+READ_SIZE = 1024 * 1024  # characters read from the JSON file at a time
+
+
+# ============================================
+# Shared cleaning helpers
+# ============================================
+
+def clean_key_column(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Drop rows whose key is missing, blank or the literal string 'nan'; strip the rest."""
+    df = df.dropna(subset=[column])
+    df[column] = df[column].astype(str).str.strip()
+    df = df[df[column].ne("")]
+    df = df[df[column].str.lower().ne("nan")]
+    return df
+
+
+def hash_columns(df: pd.DataFrame, columns: list[str]) -> pd.Series:
+    """Stable 64-bit hash of the given columns for every row, as 16 hex characters."""
+    values = df.reindex(columns=columns).astype(object)
+    values = values.where(values.notna(), "").astype(str)
+    return pd.util.hash_pandas_object(values, index=False).map("{:016x}".format)
+
+
+def shortage_keys(df: pd.DataFrame) -> pd.Series:
+    """
+    shortage_key of every row: the hash of SHORTAGE_KEY_COLUMNS, or the row's
+    content hash (row_hash) when package_ndc is missing or other listings with
+    different content share the same natural key. Only identical rows end up
+    with the same key.
+    """
+    keys = hash_columns(df, SHORTAGE_KEY_COLUMNS)
+    package_ndc = df["package_ndc"].astype("string").str.strip()
+    ambiguous = df.groupby(keys)["row_hash"].transform("nunique") > 1
+    return keys.where(package_ndc.notna() & package_ndc.ne("") & ~ambiguous, df["row_hash"])
+
+
+def parse_dates(values: pd.Series) -> tuple[pd.Series, dict]:
+    """
+    Parse a date column with the known DATE_FORMATS (vectorized).
+    Returns the parsed dates (NaT where missing or unparseable) and counts of
+    missing, parsed and failed values plus a few failing examples.
+    """
+    text = pd.Series(values, dtype="string").str.strip()
+    present = text.notna() & text.ne("")
+
+    parsed = pd.Series(pd.NaT, index=text.index, dtype="datetime64[us]")
+    for date_format in DATE_FORMATS:
+        todo = present & parsed.isna()
+        if not todo.any():
+            break
+        parsed[todo] = pd.to_datetime(text[todo], format=date_format, errors="coerce")
+
+    failed = present & parsed.isna()
+    stats = {
+        "rows": len(text),
+        "missing": int((~present).sum()),
+        "parsed": int((present & parsed.notna()).sum()),
+        "failed": int(failed.sum()),
+        "failed_examples": text[failed].unique()[:5].tolist(),
+    }
+    return parsed, stats
+
+
+def parse_date_columns(df: pd.DataFrame, table: str, metrics: dict) -> pd.DataFrame:
+    """Parse the DATE_COLUMNS of a table in place and add their counts to metrics."""
+    for column in DATE_COLUMNS.get(table, []):
+        if column not in df.columns:
+            continue
+        df[column], stats = parse_dates(df[column])
+        total = metrics.setdefault(table, {}).setdefault(column, {})
+        for key in ("rows", "missing", "parsed", "failed"):
+            total[key] = total.get(key, 0) + stats[key]
+        examples = total.setdefault("failed_examples", [])
+        examples.extend(e for e in stats["failed_examples"] if e not in examples)
+        del examples[5:]
+    return df
+
+
+def report_date_metrics(metrics: dict) -> None:
+    """Print date parse failures and save all processing metrics to METRICS_JSON."""
+    for table, columns in metrics.items():
+        for column, stats in columns.items():
+            if stats["failed"]:
+                print(f"   ✗ {table}.{column}: {stats['failed']} of {stats['rows']} dates did not parse "
+                      f"(e.g. {', '.join(stats['failed_examples'])})")
+            else:
+                print(f"   ✓ {table}.{column}: all {stats['parsed']} dates parsed ({stats['missing']} missing)")
+
+    with open(METRICS_JSON, "w", encoding="utf-8") as f:
+        json.dump({"date_parsing": metrics}, f, indent=2)
+
+
+def build_ndc_core(df_ndc: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    """Select the core product columns and clean product_ndc (no de-duplication)."""
+    ndc_core = df_ndc.reindex(columns=columns).copy()
+    if "product_ndc" in ndc_core.columns:
+        ndc_core = clean_key_column(ndc_core, "product_ndc")
+    return ndc_core
+
+
+def clean_optional_str(values: pd.Series) -> pd.Series:
+    """str(x).strip() for every value that is not None (None is kept as None)."""
+    is_none = np.equal(values.to_numpy(dtype=object), None)
+    return values.where(is_none, values.map(str).str.strip())
+
+
+def extract_packaging(df_ndc: pd.DataFrame) -> pd.DataFrame:
+    """
+    Flatten the nested packaging list (one row per package).
+    Uses explode + from_records instead of iterating over rows.
+    """
+    if "packaging" not in df_ndc.columns or df_ndc.empty:
+        return pd.DataFrame()
+
+    #keep product_ndc clean
+    if "product_ndc" in df_ndc.columns:
+        product_ndc = clean_optional_str(df_ndc["product_ndc"])
+    else:
+        product_ndc = pd.Series(None, index=df_ndc.index, dtype=object)
+
+    has_list = df_ndc["packaging"].map(lambda p: isinstance(p, list)).astype(bool)
+    exploded = pd.DataFrame({
+        "product_ndc": product_ndc[has_list],
+        "packaging": df_ndc["packaging"][has_list],
+    }).explode("packaging")
+    # empty packaging lists explode into a NaN row
+    exploded = exploded[exploded["packaging"].notna()]
+
+    if exploded.empty:
+        return pd.DataFrame()
+
+    packages = pd.DataFrame.from_records(
+        exploded["packaging"].tolist(),
+        columns=PACKAGING_FIELDS,
+    )
+    packages.insert(0, "product_ndc", exploded["product_ndc"].to_numpy())
+
+    ndc_packaging = packages
+    if "package_ndc" in ndc_packaging.columns:
+        ndc_packaging = clean_key_column(ndc_packaging, "package_ndc")
+    if "product_ndc" in ndc_packaging.columns:
+        ndc_packaging["product_ndc"] = ndc_packaging["product_ndc"].astype(str).str.strip()
+    return ndc_packaging
+
+
+def extract_contacts(df_shortages: pd.DataFrame) -> pd.DataFrame:
+    """One (package_ndc, contact_info) row for every shortage that has contact info."""
+    if "contact_info" not in df_shortages.columns:
+        return pd.DataFrame(columns=["package_ndc", "contact_info"])
+
+    if "package_ndc" in df_shortages.columns:
+        package_ndc = clean_optional_str(df_shortages["package_ndc"])
+    else:
+        package_ndc = pd.Series(None, index=df_shortages.index, dtype=object)
+
+    # same truthiness test as `if contact_info:` (drops None, "" and empty lists)
+    contact_info = df_shortages["contact_info"].astype(object)
+    has_contact = contact_info.astype(bool)
+
+    return pd.DataFrame({
+        "package_ndc": package_ndc[has_contact].to_numpy(),
+        "contact_info": contact_info[has_contact].map(str).to_numpy(),
+    }, columns=["package_ndc", "contact_info"])
+
+
+# ============================================
+# Incremental JSON reader
+# ============================================
+
+def iter_json_records(path: str, key: str = "results", read_size: int = READ_SIZE):
+    """
+    Yield the items of the top-level array `key` one at a time.
+
+    The file is read in fixed-size pieces and each record is decoded with
+    json.JSONDecoder.raw_decode, so only the current record (plus one read
+    buffer) is held in memory. Other top-level values (e.g. "meta") are
+    decoded and discarded.
+    """
+    decoder = json.JSONDecoder()
+
+    with open(path, 'r', encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def read_more():
+            nonlocal buf, pos, eof
+            chunk = f.read(read_size)
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def next_char() -> str:
+            # skip whitespace, refilling the buffer as needed
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos].isspace():
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if eof:
+                    raise ValueError(f"Unexpected end of JSON in {path}")
+                read_more()
+
+        def decode_value():
+            nonlocal pos
+            next_char()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    # a number cut at the buffer edge still decodes, so make
+                    # sure the value is followed by something before trusting it
+                    if end < len(buf) or eof:
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                read_more()
+
+        def expect(char: str) -> None:
+            nonlocal pos
+            if next_char() != char:
+                raise ValueError(f"Expected '{char}' in {path} but found '{buf[pos]}'")
+            pos += 1
+
+        read_more()
+        expect("{")
+        if next_char() == "}":
+            return
+
+        while True:
+            name = decode_value()
+            expect(":")
+
+            if name == key and next_char() == "[":
+                pos += 1
+                if next_char() == "]":
+                    pos += 1
+                else:
+                    while True:
+                        yield decode_value()
+                        if next_char() == ",":
+                            pos += 1
+                            continue
+                        expect("]")
+                        break
+            else:
+                decode_value()
+
+            if next_char() == ",":
+                pos += 1
+                continue
+            expect("}")
+            return
+
+
+def iter_batches(records, batch_size: int):
+    """Group an iterator of records into lists of at most batch_size."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
 
 # ============================================
 # Process NDC Dataset
 # ============================================
-print("\n1. Processing NDC dataset...")
 
-try:
-    # Load the NDC JSON file
-    with open('data/drug-ndc-0001-of-0001.json', 'r',encoding="utf-8") as f:
-        ndc_data = json.load(f)
-    
+def process_ndc(fmt: str = "csv", metrics: dict | None = None) -> None:
+    """Load the whole NDC file into memory and write ndc_core/ndc_packaging."""
+    # Load the NDC JSON file(s)
+    results = []
+    for path in sorted(glob.glob(NDC_PARTITIONS)) or [NDC_JSON]:
+        with open(path, 'r', encoding="utf-8") as f:
+            results.extend(json.load(f)['results'])
+
     # Extract results into DataFrame
-    df_ndc = pd.DataFrame(ndc_data['results'])
+    df_ndc = pd.DataFrame(results)
+    del results
     print(f"   Loaded {len(df_ndc)} NDC records")
-    
-    # Create core NDC products table
-    ndc_core_columns = [
-        'product_ndc', 'generic_name', 'labeler_name', 'brand_name',
-        'finished', 'marketing_category', 'dosage_form', 'route',
-        'product_type', 'marketing_start_date', 'application_number'
-    ]
-    
-    # Only keep columns that exist
-    available_columns = [col for col in ndc_core_columns if col in df_ndc.columns]
-    ndc_core = df_ndc[available_columns].copy()
+
+    # Fixed column list (missing fields become empty columns), same as the streaming mode
+    ndc_core = df_ndc.reindex(columns=NDC_CORE_OUTPUT).copy()
 
     #prevent primary key duplicate insertion
     if "product_ndc" in ndc_core.columns:
         before = len(ndc_core)
-
-        ndc_core = ndc_core.dropna(subset=["product_ndc"])
-        ndc_core["product_ndc"] = ndc_core["product_ndc"].astype(str).str.strip()
-
-        ndc_core = ndc_core[ndc_core["product_ndc"].ne("")]
-        ndc_core = ndc_core[ndc_core["product_ndc"].str.lower().ne("nan")]
+        ndc_core = clean_key_column(ndc_core, "product_ndc")
         ndc_core = ndc_core.drop_duplicates(subset=["product_ndc"], keep="first")
-
         after = len(ndc_core)
         print(f" Removed {before - after} duplicate/blank product_ndc rows")
+    ndc_core = parse_date_columns(ndc_core, "ndc_core", metrics if metrics is not None else {})
     # Save core NDC table
-    ndc_core.to_csv('data/ndc_core.csv', index=False)
-    
-    print(f"   ✓ Created ndc_core.csv ({len(ndc_core)} rows)")
-    
+    path = write_table(ndc_core, "ndc_core", fmt)
+
+    print(f"   ✓ Created {os.path.basename(path)} ({len(ndc_core)} rows)")
+
     # Extract packaging information (one-to-many relationship)
-    packaging_records = []
-    for _, row in df_ndc.iterrows():
-        product_ndc = row.get('product_ndc')
-        
-        #keep product_ndc clean
-        if product_ndc is not None:
-            product_ndc = str(product_ndc).strip()
-
-        packaging_list = row.get("packaging", [])
-        if isinstance(packaging_list, list):
-            for pkg in packaging_list:
-                packaging_records.append({
-                    'product_ndc': product_ndc,
-                    'package_ndc': pkg.get('package_ndc'),
-                    'description': pkg.get('description'),
-                    'marketing_start_date': pkg.get('marketing_start_date')
-                })
-    
-    ndc_packaging = pd.DataFrame(packaging_records)
+    before = sum(len(p) for p in df_ndc.get("packaging", []) if isinstance(p, list))
+    ndc_packaging = extract_packaging(df_ndc)
     if "package_ndc" in ndc_packaging.columns:
-        before = len(ndc_packaging)
-
-        ndc_packaging = ndc_packaging.dropna(subset=["package_ndc"])
-        ndc_packaging["package_ndc"] = ndc_packaging["package_ndc"].fillna("").astype(str).str.strip()
-        ndc_packaging = ndc_packaging[ndc_packaging["package_ndc"].ne("")]
-        ndc_packaging = ndc_packaging[ndc_packaging["package_ndc"].str.lower().ne("nan")]
         ndc_packaging = ndc_packaging.drop_duplicates(subset=["package_ndc"], keep="first")
-
         after = len(ndc_packaging)
         print(f"Removed {before - after} duplicate/blank package_ndc rows")
 
-    if "product_ndc" in ndc_packaging.columns:
-        ndc_packaging["product_ndc"] = ndc_packaging["product_ndc"].astype(str).str.strip()
+    path = write_table(ndc_packaging, "ndc_packaging", fmt)
+    print(f"   ✓ Created {os.path.basename(path)} ({len(ndc_packaging)} packages)")
+
+
+def process_ndc_streaming(batch_size: int = DEFAULT_BATCH_SIZE, fmt: str = "csv",
+                          metrics: dict | None = None) -> None:
+    """
+    Walk the NDC `results` array record by record and write ndc_core and
+    ndc_packaging in batches of batch_size, so peak memory depends on the
+    batch size rather than on the size of the dataset. Handles openFDA
+    partitions (drug-ndc-000N-of-000M) in order.
 
+    Duplicate keys are tracked across batches and both modes write the
+    fixed NDC_CORE_OUTPUT columns, so the files match the in-memory mode.
+    """
+    paths = sorted(glob.glob(NDC_PARTITIONS)) or [NDC_JSON]
+
+    records = (record for path in paths for record in iter_json_records(path))
+
+    seen_products: set[str] = set()
+    seen_packages: set[str] = set()
+    total_records = core_removed = package_removed = 0
+
+    core_writer = TableWriter("ndc_core", fmt)
+    packaging_writer = TableWriter("ndc_packaging", fmt)
+
+    for batch in iter_batches(records, batch_size):
+        df_batch = pd.DataFrame(batch)
+        total_records += len(df_batch)
+
+        ndc_core = build_ndc_core(df_batch, NDC_CORE_OUTPUT)
+        before = len(df_batch)
+        if "product_ndc" in ndc_core.columns:
+            ndc_core = ndc_core[~ndc_core["product_ndc"].isin(seen_products)]
+            ndc_core = ndc_core.drop_duplicates(subset=["product_ndc"], keep="first")
+            seen_products.update(ndc_core["product_ndc"])
+        core_removed += before - len(ndc_core)
+        ndc_core = parse_date_columns(ndc_core, "ndc_core", metrics if metrics is not None else {})
+        core_writer.write(ndc_core)
+
+        before = sum(len(p) for p in df_batch.get("packaging", []) if isinstance(p, list))
+        ndc_packaging = extract_packaging(df_batch)
+        # a batch without any packages has no columns at all, nothing to write
+        if len(ndc_packaging.columns):
+            if "package_ndc" in ndc_packaging.columns:
+                ndc_packaging = ndc_packaging[~ndc_packaging["package_ndc"].isin(seen_packages)]
+                ndc_packaging = ndc_packaging.drop_duplicates(subset=["package_ndc"], keep="first")
+                seen_packages.update(ndc_packaging["package_ndc"])
+            package_removed += before - len(ndc_packaging)
+            packaging_writer.write(ndc_packaging)
+
+        print(f"   ... {total_records:,} records processed")
+
+    core_writer.close()
+    packaging_writer.close()
+
+    print(f"   Loaded {total_records} NDC records from {len(paths)} file(s)")
+    print(f" Removed {core_removed} duplicate/blank product_ndc rows")
+    print(f"   ✓ Created {os.path.basename(core_writer.path)} ({core_writer.rows} rows)")
+    print(f"Removed {package_removed} duplicate/blank package_ndc rows")
+    print(f"   ✓ Created {os.path.basename(packaging_writer.path)} ({packaging_writer.rows} packages)")
 
-    ndc_packaging.to_csv('data/ndc_packaging.csv', index=False)
-    print(f"   ✓ Created ndc_packaging.csv ({len(ndc_packaging)} packages)")
-    
-except Exception as e:
-    print(f"   ✗ Error processing NDC dataset: {e}")
 
 # ============================================
 # Process Drug Shortages Dataset
 # ============================================
-print("\n2. Processing Drug Shortages dataset...")
 
-try:
+def process_shortages(fmt: str = "csv", metrics: dict | None = None) -> None:
     # Load the drug shortage JSON file
-    with open('data/drug-shortages-0001-of-0001.json', 'r',encoding="utf-8") as f:
+    with open(SHORTAGES_JSON, 'r', encoding="utf-8") as f:
         shortage_data = json.load(f)
-    
+
     # Extract results into DataFrame
     df_shortages = pd.DataFrame(shortage_data['results'])
     print(f"   Loaded {len(df_shortages)} shortage records")
-    
+
     # Create core shortage table with fields that actually exist
     shortage_core = pd.DataFrame({
         'package_ndc': df_shortages.get('package_ndc'),
@@ -120,47 +444,78 @@ try:
         'dosage_form': df_shortages.get('presentation'),  # Use presentation field
         'reason': None  # Not available in FDA data
     })
-    if "package_ndc" in shortage_core.columns:
-        shortage_core = shortage_core.dropna(subset=["package_ndc"])
-        shortage_core["package_ndc"] = shortage_core["package_ndc"].astype(str).str.strip()
-        shortage_core = shortage_core[shortage_core["package_ndc"].ne("")]
-        shortage_core = shortage_core[shortage_core["package_ndc"].str.lower().ne("nan")]
+    shortage_core = parse_date_columns(shortage_core, "drug_shortages_core", metrics if metrics is not None else {})
+
+    # Content hash over everything a shortage row and its contact carry,
+    # so the incremental load can tell changed rows from unchanged ones
+    content = shortage_core.assign(contact_info=df_shortages.get('contact_info'))
+    shortage_core['row_hash'] = hash_columns(content, list(content.columns))
+
+    before = len(shortage_core)
+    shortage_core = clean_key_column(shortage_core, "package_ndc")
+    print(f" Removed {before - len(shortage_core)} shortage rows without package_ndc")
+
+    before = len(shortage_core)
+    shortage_core['shortage_key'] = shortage_keys(shortage_core)
+    shortage_core = shortage_core.drop_duplicates(subset=['shortage_key'], keep='first')
+    print(f" Removed {before - len(shortage_core)} identical duplicate shortage rows")
+    shortage_core = shortage_core[[c for c in shortage_core.columns if c != 'row_hash'] + ['row_hash']]
     # Save core shortage table
-    shortage_core.to_csv('data/drug_shortages_core.csv', index=False)
-    
-    print(f"   ✓ Created drug_shortages_core.csv ({len(shortage_core)} shortages)")
-    
+    path = write_table(shortage_core, "drug_shortages_core", fmt)
+
+    print(f"   ✓ Created {os.path.basename(path)} ({len(shortage_core)} shortages)")
+
     # Extract contact information
-    contact_records = []
-    for _, row in df_shortages.iterrows():
-        package_ndc = row.get('package_ndc')
-        if package_ndc is not None:
-            package_ndc = str(package_ndc).strip()
-
-        contact_info = row.get('contact_info')
-        if contact_info:
-            contact_records.append({
-                'package_ndc': package_ndc,
-                'contact_info': str(contact_info)
-            })
-    
-    shortage_contacts = pd.DataFrame(contact_records, columns=["package_ndc", "contact_info"])
-    shortage_contacts.to_csv("data/shortage_contacts.csv", index=False)
+    shortage_contacts = extract_contacts(df_shortages)
+    path = write_table(shortage_contacts, "shortage_contacts", fmt)
     if not shortage_contacts.empty:
-        shortage_contacts = shortage_contacts.dropna(subset=["package_ndc"])
-        shortage_contacts["package_ndc"] = shortage_contacts["package_ndc"].astype(str).str.strip()
-        shortage_contacts = shortage_contacts[shortage_contacts["package_ndc"].ne("")]
-        shortage_contacts = shortage_contacts[shortage_contacts["package_ndc"].str.lower().ne("nan")]
+        shortage_contacts = clean_key_column(shortage_contacts, "package_ndc")
         shortage_contacts = shortage_contacts.drop_duplicates(subset=["package_ndc", "contact_info"], keep="first")
-    print(f"  Created shortage_contacts.csv ({len(shortage_contacts)} contacts)")
-
-except Exception as e:
-    print(f"   ✗ Error processing Drug Shortages dataset: {e}")
-
-print("\n✓ Data processing complete!")
-print("\nGenerated files in data/ directory:")
-print("  - ndc_core.csv")
-print("  - ndc_packaging.csv")
-print("  - drug_shortages_core.csv")
-print("  - shortage_contacts.csv")
-print("\nNext step: Load these CSV files into MySQL")
+    print(f"  Created {os.path.basename(path)} ({len(shortage_contacts)} contacts)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Clean FDA JSON downloads into CSV/Parquet tables")
+    parser.add_argument("--streaming", action="store_true",
+                        help="parse the NDC file record by record instead of loading it whole")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"records per batch in streaming mode (default {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--format", choices=FORMATS, default="csv",
+                        help="intermediate file format (parquet needs pyarrow)")
+    args = parser.parse_args()
+
+    fmt = args.format
+    if fmt == "parquet" and not parquet_available():
+        print("pyarrow is not installed, writing CSV instead of Parquet")
+        fmt = "csv"
+
+    print("Starting data processing...")
+    metrics: dict = {}
+
+    print("\n1. Processing NDC dataset...")
+    try:
+        if args.streaming:
+            process_ndc_streaming(args.batch_size, fmt, metrics)
+        else:
+            process_ndc(fmt, metrics)
+    except Exception as e:
+        print(f"   ✗ Error processing NDC dataset: {e}")
+
+    print("\n2. Processing Drug Shortages dataset...")
+    try:
+        process_shortages(fmt, metrics)
+    except Exception as e:
+        print(f"   ✗ Error processing Drug Shortages dataset: {e}")
+
+    print("\n3. Date parsing...")
+    report_date_metrics(metrics)
+
+    print("\n✓ Data processing complete!")
+    print("\nGenerated files in data/ directory:")
+    for name in ("ndc_core", "ndc_packaging", "drug_shortages_core", "shortage_contacts"):
+        print(f"  - {name}.{fmt}")
+    print("\nNext step: Load these files into MySQL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+SQL Transformations Driver
+Builds shortages_with_ndc from the raw tables (replaces `mysql < sql/02_transformations.sql`).
+
+Incremental mode recomputes only the joined rows for packages the loader
+listed in transform_change_log, in one transaction, so readers keep seeing
+the previous rows until it commits. A full refresh requested by the loader
+takes the same path (DELETE and INSERT of every row). shortage_id comes from
+the shortage_ids table and never changes for a shortage. The materialized
+summaries behind the risk views are refreshed in the same transaction.
+
+Full mode (the first run, or --full after editing the SQL file) runs
+sql/02_transformations.sql. It is NOT atomic: the file drops and recreates
+shortages_with_ndc, classification_rules and the *_summary tables, and
+MySQL commits every DDL statement on its own. Readers see missing or empty
+tables while it runs, and a failure part way leaves them half-built (re-run
+--full). The change log is cleared and the version bumped only after the
+whole file succeeded.
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+TRANSFORMATIONS_SQL = "sql/02_transformations.sql"
+
+# same statement as in 02_transformations.sql: new shortages get the next id
+ASSIGN_SHORTAGE_IDS = """
+    INSERT INTO shortage_ids (shortage_key)
+    SELECT s.shortage_key
+    FROM raw_drug_shortages s
+    LEFT JOIN shortage_ids i
+        ON i.shortage_key = s.shortage_key
+    WHERE s.shortage_key IS NOT NULL
+        AND i.shortage_key IS NULL
+    ORDER BY s.package_ndc, s.shortage_key
+"""
+
+# Summary tables refreshed from their *_source views (see 02_transformations.sql)
+SUMMARIES = ["multi_package_shortages", "manufacturer_risk_analysis", "current_manufacturer_risk"]
+
+# Packages whose joined rows must be recomputed: logged packages, packages of
+# logged products, and packages currently joined to a logged product
+AFFECTED_PACKAGES = [
+    """
+    INSERT IGNORE INTO affected_packages
+    SELECT package_ndc FROM transform_change_log
+    WHERE change_id <= :max_id AND package_ndc IS NOT NULL
+    """,
+    """
+    INSERT IGNORE INTO affected_packages
+    SELECT p.package_ndc
+    FROM transform_change_log c
+    JOIN raw_ndc_packaging p ON p.product_ndc = c.product_ndc
+    WHERE c.change_id <= :max_id
+    """,
+    """
+    INSERT IGNORE INTO affected_packages
+    SELECT w.package_ndc
+    FROM transform_change_log c
+    JOIN shortages_with_ndc w ON w.product_ndc = c.product_ndc
+    WHERE c.change_id <= :max_id AND w.package_ndc IS NOT NULL
+    """,
+]
+
+
+def get_engine():
+    """Create a SQLAlchemy engine using environment variables."""
+    user = os.getenv("DB_USER", "pipeline_user")
+    password = os.getenv("DB_PASSWORD", "pipeline_password")
+    host = os.getenv("DB_HOST", "127.0.0.1")
+    port = os.getenv("DB_PORT", "3306")
+    db = os.getenv("DB_NAME", "fda_shortage_db")
+
+    conn_str = f"mysql+mysqlconnector://{user}:{password}@{host}:{port}/{db}"
+    return create_engine(conn_str, pool_pre_ping=True)
+
+
+def split_sql_statements(sql_text: str) -> list[str]:
+    """Split a SQL file on ';' at line ends, skipping blank and comment lines."""
+    statements, buffer = [], []
+    for line in sql_text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("--"):
+            continue
+        buffer.append(line)
+        if stripped.endswith(";"):
+            statements.append("\n".join(buffer).strip().rstrip(";"))
+            buffer = []
+    if buffer:
+        statements.append("\n".join(buffer).strip().rstrip(";"))
+    return statements
+
+
+def run_sql_file(conn, path: str) -> None:
+    """Execute every statement of a SQL file and print any result sets."""
+    for stmt in split_sql_statements(Path(path).read_text(encoding="utf-8")):
+        if stmt.upper().startswith("USE "):
+            continue  # the engine already points at DB_NAME
+        result = conn.execute(text(stmt))
+        if result.returns_rows:
+            rows = result.fetchall()
+            print("  " + " | ".join(result.keys()))
+            for row in rows:
+                print("  " + " | ".join(str(v) for v in row))
+
+
+def table_exists(conn, name: str) -> bool:
+    return conn.execute(
+        text("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = :name"),
+        {"name": name},
+    ).scalar() > 0
+
+
+def refresh_incremental(conn, max_id: int) -> dict:
+    """Recompute the joined rows for every change up to max_id (caller owns the transaction)."""
+    conn.execute(text(ASSIGN_SHORTAGE_IDS))
+
+    full = conn.execute(text("""
+        SELECT COUNT(*) FROM transform_change_log
+        WHERE change_id <= :max_id AND product_ndc IS NULL AND package_ndc IS NULL
+    """), {"max_id": max_id}).scalar()
+
+    if full:
+        deleted = conn.execute(text("DELETE FROM shortages_with_ndc")).rowcount
+        inserted = conn.execute(text("INSERT INTO shortages_with_ndc SELECT * FROM shortages_with_ndc_source")).rowcount
+        return {"packages": "all", "deleted": deleted, "inserted": inserted}
+
+    conn.execute(text("CREATE TEMPORARY TABLE affected_packages (package_ndc VARCHAR(30) PRIMARY KEY)"))
+    try:
+        for stmt in AFFECTED_PACKAGES:
+            conn.execute(text(stmt), {"max_id": max_id})
+        packages = conn.execute(text("SELECT COUNT(*) FROM affected_packages")).scalar()
+
+        deleted = conn.execute(text("""
+            DELETE w FROM shortages_with_ndc w
+            JOIN affected_packages a ON a.package_ndc = w.package_ndc
+        """)).rowcount
+        inserted = conn.execute(text("""
+            INSERT INTO shortages_with_ndc
+            SELECT src.* FROM shortages_with_ndc_source src
+            JOIN affected_packages a ON a.package_ndc = src.package_ndc
+        """)).rowcount
+    finally:
+        conn.execute(text("DROP TEMPORARY TABLE IF EXISTS affected_packages"))
+
+    return {"packages": packages, "deleted": deleted, "inserted": inserted}
+
+
+def refresh_summaries(conn) -> None:
+    """Recompute every <view>_summary table from its <view>_source aggregate."""
+    for name in SUMMARIES:
+        conn.execute(text(f"DELETE FROM {name}_summary"))
+        conn.execute(text(f"INSERT INTO {name}_summary SELECT src.*, NOW() FROM {name}_source src"))
+
+
+def bump_pipeline_version(conn) -> None:
+    """Same as load_to_mysql.bump_pipeline_version: dashboards drop cached results."""
+    conn.execute(text("""
+        INSERT INTO pipeline_version (id, version) VALUES (1, 1)
+        ON DUPLICATE KEY UPDATE version = version + 1
+    """))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build shortages_with_ndc and the analysis views")
+    parser.add_argument("--full", action="store_true",
+                        help=f"rebuild everything from {TRANSFORMATIONS_SQL} instead of applying the change log")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    try:
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            max_id = conn.execute(text("SELECT MAX(change_id) FROM transform_change_log")).scalar()
+            required = ["shortages_with_ndc", "shortages_with_ndc_source"] + [f"{n}_summary" for n in SUMMARIES]
+            full = args.full or not all(table_exists(conn, name) for name in required)
+
+        if full:
+            print(f"Running {TRANSFORMATIONS_SQL} (full rebuild, tables are unavailable until it finishes)...")
+            # DDL commits implicitly, so there is no transaction to wrap the file in
+            with engine.connect() as conn:
+                try:
+                    run_sql_file(conn, TRANSFORMATIONS_SQL)
+                    conn.commit()
+                except Exception:
+                    print("   ✗ Full rebuild failed part way, tables may be incomplete: re-run with --full")
+                    raise
+            with engine.begin() as conn:
+                if max_id is not None:
+                    conn.execute(text("DELETE FROM transform_change_log WHERE change_id <= :max_id"),
+                                 {"max_id": max_id})
+                bump_pipeline_version(conn)
+        elif max_id is None:
+            print("No changes logged since the last run, shortages_with_ndc is up to date")
+        else:
+            print("Applying logged changes to shortages_with_ndc...")
+            with engine.begin() as conn:
+                stats = refresh_incremental(conn, max_id)
+                refresh_summaries(conn)
+                bump_pipeline_version(conn)
+                conn.execute(text("DELETE FROM transform_change_log WHERE change_id <= :max_id"),
+                             {"max_id": max_id})
+            print(f"   ✓ {stats['packages']} packages recomputed: "
+                  f"{stats['deleted']:,} rows removed, {stats['inserted']:,} rows inserted")
+            print(f"   ✓ Refreshed {len(SUMMARIES)} summary tables")
+
+        print(f"\n✓ Transformations complete ({time.perf_counter() - start:.1f}s)")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
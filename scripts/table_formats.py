@@ -0,0 +1,184 @@
+"""
+Intermediate Table Formats
+Shared by process_data.py (writer) and load_to_mysql.py (reader).
+
+The processed tables can be stored as CSV (always available) or Parquet
+(needs pyarrow). Parquet keeps the column types from the explicit schemas
+below and is read back into Arrow-backed DataFrames without re-parsing text.
+"""
+
+import os
+
+import pandas as pd
+
+DATA_DIR = "data"
+
+FORMATS = ("csv", "parquet")
+
+# Explicit column types for every intermediate table (in file column order)
+TABLE_SCHEMAS = {
+    "ndc_core": [
+        ("product_ndc", "string"),
+        ("generic_name", "string"),
+        ("labeler_name", "string"),
+        ("brand_name", "string"),
+        ("finished", "bool"),
+        ("marketing_category", "string"),
+        ("dosage_form", "string"),
+        ("route", "string"),
+        ("product_type", "string"),
+        ("marketing_start_date", "date32"),
+        ("application_number", "string"),
+    ],
+    "ndc_packaging": [
+        ("product_ndc", "string"),
+        ("package_ndc", "string"),
+        ("description", "string"),
+        ("marketing_start_date", "string"),
+    ],
+    "drug_shortages_core": [
+        ("package_ndc", "string"),
+        ("generic_name", "string"),
+        ("company_name", "string"),
+        ("status", "string"),
+        ("therapeutic_category", "string"),
+        ("initial_posting_date", "date32"),
+        ("update_date", "date32"),
+        ("dosage_form", "string"),
+        ("reason", "string"),
+        ("shortage_key", "string"),
+        ("row_hash", "string"),
+    ],
+    "shortage_contacts": [
+        ("package_ndc", "string"),
+        ("contact_info", "string"),
+    ],
+}
+
+
+def parquet_available() -> bool:
+    """True when pyarrow is installed."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def table_path(name: str, fmt: str, data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, f"{name}.{fmt}")
+
+
+def arrow_schema(name: str):
+    import pyarrow as pa
+
+    return pa.schema([(column, pa.type_for_alias(type_name)) for column, type_name in TABLE_SCHEMAS[name]])
+
+
+def to_arrow(df: pd.DataFrame, name: str):
+    """
+    Convert a processed DataFrame to an Arrow table with the explicit schema.
+    Values that are not plain strings (e.g. the NDC `route` list) are stored
+    as their text form, exactly as they would appear in the CSV.
+    """
+    import pyarrow as pa
+
+    schema = arrow_schema(name)
+    df = df.reindex(columns=schema.names)
+    arrays = []
+    for field in schema:
+        col = df[field.name]
+        try:
+            arrays.append(pa.array(col, type=field.type, from_pandas=True))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            if not pa.types.is_string(field.type):
+                raise
+            # mixed column: convert anything that is not already text
+            col = col.astype(object)
+            needs_text = col.notna() & ~col.map(lambda v: isinstance(v, str)).astype(bool)
+            col = col.where(~needs_text, col[needs_text].map(str))
+            arrays.append(pa.array(col, type=field.type, from_pandas=True))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def write_table(df: pd.DataFrame, name: str, fmt: str = "csv", data_dir: str = DATA_DIR) -> str:
+    """Write one processed table in the requested format and return its path."""
+    path = table_path(name, fmt, data_dir)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(to_arrow(df, name), path)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+class TableWriter:
+    """Append DataFrame batches to one table file (used by the streaming mode)."""
+
+    def __init__(self, name: str, fmt: str = "csv", data_dir: str = DATA_DIR):
+        self.name = name
+        self.fmt = fmt
+        self.path = table_path(name, fmt, data_dir)
+        self.rows = 0
+        self._parquet = None
+        self._columns = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, arrow_schema(self.name))
+            self._parquet.write_table(to_arrow(df, self.name))
+        else:
+            # later batches follow the column order of the first one
+            if self._columns is None:
+                self._columns = list(df.columns)
+            df = df.reindex(columns=self._columns)
+            df.to_csv(self.path, mode="a", header=not os.path.exists(self.path), index=False)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+        elif not os.path.exists(self.path):
+            # nothing was written: keep the same output as an empty table
+            write_table(pd.DataFrame(), self.name, self.fmt, os.path.dirname(self.path))
+
+
+def resolve_format(name: str, fmt: str = "auto", data_dir: str = DATA_DIR) -> str:
+    """
+    Pick the file format to read for a table.
+    "auto" uses Parquet when pyarrow is installed and the Parquet file is at
+    least as new as the CSV, otherwise falls back to CSV.
+    """
+    if fmt != "auto":
+        return fmt
+
+    csv_path = table_path(name, "csv", data_dir)
+    parquet_path = table_path(name, "parquet", data_dir)
+    if os.path.exists(parquet_path) and parquet_available():
+        if not os.path.exists(csv_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+            return "parquet"
+    return "csv"
+
+
+def read_table(name: str, fmt: str = "auto", data_dir: str = DATA_DIR) -> pd.DataFrame:
+    """
+    Read a processed table. Parquet is returned as an Arrow-backed DataFrame
+    (pd.ArrowDtype columns), so no text parsing or copy into NumPy objects.
+    """
+    fmt = resolve_format(name, fmt, data_dir)
+    path = table_path(name, fmt, data_dir)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path).to_pandas(types_mapper=pd.ArrowDtype)
+    # keep text columns as text (e.g. hex hashes or NDCs that look like numbers);
+    # dates stay as their ISO text, which MySQL DATE columns accept directly
+    text_columns = {column: str for column, type_name in TABLE_SCHEMAS.get(name, [])
+                    if type_name in ("string", "date32")}
+    return pd.read_csv(path, dtype=text_columns)
@@ -0,0 +1,196 @@
+"""
+Pre-load Validation
+Checks the tables written by process_data.py before load_to_mysql.py runs,
+so bad data stops the pipeline in seconds instead of after the load.
+
+Every check is a vectorized pandas operation on the processed frames:
+schema (columns and types), key uniqueness, packages whose product_ndc
+is missing from ndc_core (the raw_ndc_packaging foreign key), and date
+parse rates from data/process_metrics.json. Results are printed and
+saved to data/validation_report.json; the script exits with status 1
+when a critical check fails.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+from table_formats import TABLE_SCHEMAS, read_table, resolve_format, table_path
+
+METRICS_JSON = "data/process_metrics.json"
+REPORT_JSON = "data/validation_report.json"
+
+# Primary keys in MySQL: must be present and unique
+KEY_COLUMNS = {
+    "ndc_core": "product_ndc",
+    "ndc_packaging": "package_ndc",
+    "drug_shortages_core": "shortage_key",
+}
+
+# Columns the load or the transformations cannot do without
+REQUIRED_COLUMNS = {
+    "ndc_core": ["product_ndc", "generic_name", "brand_name"],
+    "ndc_packaging": ["product_ndc", "package_ndc"],
+    "drug_shortages_core": ["package_ndc", "status", "shortage_key", "row_hash"],
+    "shortage_contacts": ["package_ndc"],
+}
+
+DEFAULT_MIN_DATE_PARSE = 99.0   # % of present dates that parsed
+
+
+class Report:
+    """Collects check results: critical failures stop the load, warnings do not."""
+
+    def __init__(self):
+        self.checks: list[dict] = []
+
+    def add(self, table: str, check: str, passed: bool, detail: str, critical: bool = True) -> None:
+        status = "PASS" if passed else ("FAIL" if critical else "WARN")
+        self.checks.append({"table": table, "check": check, "status": status, "detail": detail})
+        mark = "✓" if passed else ("✗" if critical else "!")
+        print(f"   {mark} {table}: {check} - {detail}")
+
+    @property
+    def failed(self) -> list[dict]:
+        return [c for c in self.checks if c["status"] == "FAIL"]
+
+    def save(self, path: str = REPORT_JSON) -> None:
+        record = {
+            "generated_at": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "passed": not self.failed,
+            "checks": self.checks,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+
+
+# ============================================
+# Checks
+# ============================================
+
+def check_schema(report: Report, name: str, df: pd.DataFrame) -> None:
+    """Columns against TABLE_SCHEMAS, and date/bool columns hold values of that type."""
+    expected = [column for column, _ in TABLE_SCHEMAS[name]]
+    missing_required = [c for c in REQUIRED_COLUMNS.get(name, []) if c not in df.columns]
+    missing = [c for c in expected if c not in df.columns and c not in missing_required]
+    extra = [c for c in df.columns if c not in expected]
+
+    report.add(name, "required columns", not missing_required,
+               f"missing {', '.join(missing_required)}" if missing_required else f"{len(df.columns)} columns")
+    if missing:
+        report.add(name, "optional columns", False, f"missing {', '.join(missing)} (loaded as NULL)",
+                   critical=False)
+    if extra:
+        report.add(name, "unexpected columns", False, ", ".join(extra))
+
+    for column, type_name in TABLE_SCHEMAS[name]:
+        if column not in df.columns or type_name not in ("date32", "bool"):
+            continue
+        values = df[column].dropna()
+        if type_name == "date32":
+            # CSV keeps ISO text, Parquet a date type: both must read back as dates
+            bad = pd.to_datetime(values.astype("string"), format="%Y-%m-%d", errors="coerce").isna()
+        else:
+            bad = ~values.astype("string").str.lower().isin(["true", "false", "1", "0"])
+        report.add(name, f"{column} type", not bad.any(),
+                   f"{int(bad.sum()):,} values are not {type_name}" if bad.any() else type_name)
+
+
+def check_keys(report: Report, name: str, df: pd.DataFrame) -> None:
+    """Every key present, non-blank and unique."""
+    column = KEY_COLUMNS.get(name)
+    if column is None or column not in df.columns:
+        return
+    keys = df[column].astype("string").str.strip()
+    blank = int((keys.isna() | keys.eq("")).sum())
+    duplicated = int(keys[keys.notna()].duplicated().sum())
+    report.add(name, f"{column} present", blank == 0,
+               f"{blank:,} blank keys" if blank else f"{len(df):,} rows")
+    report.add(name, f"{column} unique", duplicated == 0,
+               f"{duplicated:,} duplicate keys" if duplicated else "no duplicates")
+
+
+def check_product_coverage(report: Report, core: pd.DataFrame, packaging: pd.DataFrame) -> None:
+    """
+    Every non-NULL ndc_packaging.product_ndc must exist in ndc_core:
+    raw_ndc_packaging has a foreign key to raw_ndc, so one orphan fails the load.
+    """
+    if "product_ndc" not in core.columns or "product_ndc" not in packaging.columns:
+        return
+    products = packaging["product_ndc"].astype("string")
+    orphaned = products.notna() & ~products.isin(core["product_ndc"].astype("string").dropna())
+    count = int(orphaned.sum())
+    detail = f"{count:,} of {len(products):,} packages have no product in ndc_core"
+    if count:
+        detail += f", e.g. {', '.join(products[orphaned].unique()[:5].tolist())}"
+    report.add("ndc_packaging", "product_ndc in ndc_core", count == 0, detail)
+
+
+def check_date_parsing(report: Report, metrics: dict, min_pct: float) -> None:
+    """Parse rate of every date column, from the counts process_data.py saved."""
+    for table, columns in metrics.items():
+        for column, stats in columns.items():
+            present = stats["rows"] - stats["missing"]
+            pct = 100.0 * stats["parsed"] / present if present else 100.0
+            detail = f"{pct:.2f}% of {present:,} dates parsed (minimum {min_pct}%)"
+            if stats["failed_examples"]:
+                detail += f", e.g. {', '.join(stats['failed_examples'])}"
+            report.add(table, f"{column} parse rate", pct >= min_pct, detail)
+
+
+def validate(tables: dict[str, pd.DataFrame], metrics: dict | None,
+             min_date_parse: float = DEFAULT_MIN_DATE_PARSE) -> Report:
+    """Run every check on the processed frames."""
+    report = Report()
+    for name, df in tables.items():
+        report.add(name, "rows", len(df) > 0 or name == "shortage_contacts", f"{len(df):,} rows")
+        check_schema(report, name, df)
+        check_keys(report, name, df)
+    check_product_coverage(report, tables["ndc_core"], tables["ndc_packaging"])
+    if metrics is None:
+        report.add("process_data", "date metrics", False, f"{METRICS_JSON} not found", critical=False)
+    else:
+        check_date_parsing(report, metrics, min_date_parse)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Validate the processed tables before loading them into MySQL")
+    parser.add_argument("--format", choices=["auto", "csv", "parquet"], default="auto",
+                        help="which intermediate files to read (default: newest, as the loader does)")
+    parser.add_argument("--min-date-parse", type=float, default=DEFAULT_MIN_DATE_PARSE,
+                        help=f"minimum %% of present dates that parsed (default {DEFAULT_MIN_DATE_PARSE})")
+    args = parser.parse_args()
+
+    print("Validating processed tables...")
+
+    tables = {}
+    for name in TABLE_SCHEMAS:
+        fmt = resolve_format(name, args.format)
+        path = table_path(name, fmt)
+        if not os.path.exists(path):
+            print(f"   ✗ {path} not found. Run process_data.py first.")
+            sys.exit(1)
+        tables[name] = read_table(name, fmt)
+
+    metrics = None
+    if os.path.exists(METRICS_JSON):
+        with open(METRICS_JSON, encoding="utf-8") as f:
+            metrics = json.load(f).get("date_parsing", {})
+
+    report = validate(tables, metrics, args.min_date_parse)
+    report.save()
+
+    if report.failed:
+        print(f"\n✗ {len(report.failed)} critical check(s) failed, not loading (see {REPORT_JSON})")
+        sys.exit(1)
+    print(f"\n✓ All critical checks passed ({REPORT_JSON})")
+    print("\nNext step: Load these files into MySQL")
+
+
+if __name__ == "__main__":
+    main()
@@ -26,7 +26,7 @@ CREATE TABLE raw_ndc (
     dosage_form TEXT,
     route TEXT,
     product_type VARCHAR(150),
-    marketing_start_date VARCHAR(20),
+    marketing_start_date DATE,   -- parsed in process_data.py
     application_number VARCHAR(50),
     INDEX idx_labeler (labeler_name(255)),
     INDEX idx_brand (brand_name(255))
@@ -59,13 +59,18 @@ CREATE TABLE raw_drug_shortages (
     company_name TEXT,
     status VARCHAR(50),
     therapeutic_category TEXT,
-    initial_posting_date VARCHAR(20),
-    update_date VARCHAR(20),
+    initial_posting_date DATE,   -- parsed in process_data.py
+    update_date DATE,
     dosage_form TEXT,
     reason TEXT,
+    shortage_key CHAR(16),   -- hash of (package_ndc, initial_posting_date), or row_hash when that is ambiguous
+    row_hash CHAR(16),       -- content hash used by incremental loads
+    UNIQUE KEY uq_shortage_key (shortage_key),
     INDEX idx_package_ndc (package_ndc),
     INDEX idx_status (status),
-    INDEX idx_company (company_name(255))
+    INDEX idx_company (company_name(255)),
+    INDEX idx_initial_posting_date (initial_posting_date),
+    INDEX idx_update_date (update_date)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 
@@ -83,6 +88,34 @@ CREATE TABLE shortage_contacts (
     INDEX idx_shortage_id (shortage_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- ============================================
+-- Pipeline bookkeeping (kept across re-runs)
+-- transform_change_log: products/packages the loader changed since the
+--   last transformation run (both keys NULL = rebuild everything)
+-- shortage_ids: stable shortage_id for every shortage_key ever loaded
+-- pipeline_version: single row bumped after every load/transformation run;
+--   the dashboard drops its query cache when it changes
+-- ============================================
+CREATE TABLE IF NOT EXISTS transform_change_log (
+    change_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    source_table VARCHAR(64) NOT NULL,
+    product_ndc VARCHAR(20),
+    package_ndc VARCHAR(30),
+    logged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS shortage_ids (
+    shortage_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    shortage_key CHAR(16) NOT NULL,
+    UNIQUE KEY uq_shortage_key (shortage_key)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS pipeline_version (
+    id TINYINT PRIMARY KEY,
+    version BIGINT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
 -- ============================================
 -- Verification Queries
 -- ============================================
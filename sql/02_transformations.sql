@@ -11,15 +11,16 @@ USE fda_shortage_db;
 DROP TABLE IF EXISTS shortages_with_ndc;
 
 -- create table with columns from shortages and ndc tables
+-- (shortage_id comes from shortage_ids, so it stays the same across runs)
 CREATE TABLE shortages_with_ndc (
-  shortage_id BIGINT,
+  shortage_id BIGINT PRIMARY KEY,
   package_ndc VARCHAR(30),
   shortage_generic_name TEXT,
   company_name VARCHAR(255),
   status VARCHAR(50),
   therapeutic_category TEXT,
-  initial_posting_date VARCHAR(20),
-  update_date VARCHAR(20),
+  initial_posting_date DATE,
+  update_date DATE,
   initial_posting_date_dt DATE,
   update_date_dt DATE,
   shortage_dosage_form TEXT,
@@ -37,14 +38,63 @@ CREATE TABLE shortages_with_ndc (
   ndc_dosage_form TEXT,
   route TEXT,
   product_type VARCHAR(100),
-  application_number VARCHAR(50)
+  application_number VARCHAR(50),
+
+  -- classified once from classification_rules
+  package_type VARCHAR(30),
+  route_group VARCHAR(30),
+
+  -- indexable copy of ndc_generic_name for the drill-down
+  ndc_generic_key VARCHAR(255)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
--- Insert joined data into the new table
-INSERT INTO shortages_with_ndc
+-- ============================================
+-- Classification rules shared by every consumer
+-- The first matching pattern (lowest priority) wins; the empty pattern is
+-- the catch-all. NULL descriptions/routes stay NULL.
+-- Re-run with scripts/run_transformations.py --full after editing.
+-- ============================================
+DROP TABLE IF EXISTS classification_rules;
+CREATE TABLE classification_rules (
+  rule_set VARCHAR(30) NOT NULL,
+  priority INT NOT NULL,
+  pattern VARCHAR(100) NOT NULL,
+  label VARCHAR(30) NOT NULL,
+  PRIMARY KEY (rule_set, priority)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+INSERT INTO classification_rules (rule_set, priority, pattern, label) VALUES
+  ('package_type', 10, 'bottle', 'Bottle'),
+  ('package_type', 20, 'vial', 'Vial'),
+  ('package_type', 30, 'blister', 'Blister Pack'),
+  ('package_type', 40, 'carton', 'Carton'),
+  ('package_type', 50, 'kit', 'Kit'),
+  ('package_type', 999, '', 'Other/Unknown'),
+  ('route_group', 10, 'oral', 'Oral'),
+  ('route_group', 20, 'intravenous', 'Intravenous'),
+  ('route_group', 21, 'iv', 'Intravenous'),
+  ('route_group', 30, 'injection', 'Injection'),
+  ('route_group', 40, 'topical', 'Topical'),
+  ('route_group', 50, 'inhalation', 'Inhalation'),
+  ('route_group', 999, '', 'Other');
+
+-- Give every new shortage a permanent id (existing ones keep theirs)
+INSERT INTO shortage_ids (shortage_key)
+SELECT s.shortage_key
+FROM raw_drug_shortages s
+LEFT JOIN shortage_ids i
+    ON i.shortage_key = s.shortage_key
+WHERE s.shortage_key IS NOT NULL
+    AND i.shortage_key IS NULL
+ORDER BY s.package_ndc, s.shortage_key;
+
+-- The join itself, as a view so the incremental driver
+-- (scripts/run_transformations.py) can recompute only some packages
+DROP VIEW IF EXISTS shortages_with_ndc_source;
+CREATE OR REPLACE VIEW shortages_with_ndc_source AS
 SELECT 
-    -- Generate row ID
-    ROW_NUMBER() OVER (ORDER BY s.package_ndc) as shortage_id,
+    -- Stable row ID
+    i.shortage_id,
     
     -- Shortage information
     s.package_ndc,
@@ -54,21 +104,9 @@ SELECT
     s.therapeutic_category,
     s.initial_posting_date,
     s.update_date,
-    CASE
-      WHEN s.initial_posting_date REGEXP '^[0-9]{8}$'
-      THEN STR_TO_DATE(s.initial_posting_date, '%Y%m%d')
-      WHEN s.initial_posting_date REGEXP '^[0-9]{1,2}/[0-9]{1,2}/[0-9]{4}$'
-      THEN STR_TO_DATE(s.initial_posting_date, '%m/%d/%Y')
-      ELSE NULL
-    END AS initial_posting_date_dt,
-
-    CASE
-      WHEN s.update_date REGEXP '^[0-9]{8}$'
-      THEN STR_TO_DATE(s.update_date, '%Y%m%d')
-      WHEN s.update_date REGEXP '^[0-9]{1,2}/[0-9]{1,2}/[0-9]{4}$'
-      THEN STR_TO_DATE(s.update_date, '%m/%d/%Y')
-      ELSE NULL
-    END AS update_date_dt,
+    -- dates are parsed in process_data.py; the _dt names are kept for existing queries
+    s.initial_posting_date AS initial_posting_date_dt,
+    s.update_date AS update_date_dt,
     s.dosage_form AS shortage_dosage_form,
     s.reason,
     
@@ -86,20 +124,50 @@ SELECT
     n.dosage_form AS ndc_dosage_form,
     n.route,
     n.product_type,
-    n.application_number
+    n.application_number,
+
+    -- Classification (first matching rule)
+    (SELECT r.label FROM classification_rules r
+     WHERE r.rule_set = 'package_type'
+       AND LOWER(p.description) LIKE CONCAT('%', r.pattern, '%')
+     ORDER BY r.priority LIMIT 1) AS package_type,
+    (SELECT r.label FROM classification_rules r
+     WHERE r.rule_set = 'route_group'
+       AND LOWER(n.route) LIKE CONCAT('%', r.pattern, '%')
+     ORDER BY r.priority LIMIT 1) AS route_group,
+
+    LEFT(n.generic_name, 255) AS ndc_generic_key
     
 FROM raw_drug_shortages s
+JOIN shortage_ids i
+    ON i.shortage_key = s.shortage_key
 LEFT JOIN raw_ndc_packaging p 
     ON s.package_ndc = p.package_ndc
 LEFT JOIN raw_ndc n 
     ON p.product_ndc = n.product_ndc;
 
+-- Insert joined data into the new table
+INSERT INTO shortages_with_ndc
+SELECT * FROM shortages_with_ndc_source;
+
 -- Add indexes for better query performance
 
 CREATE INDEX idx_status ON shortages_with_ndc(status);
-CREATE INDEX idx_company ON shortages_with_ndc(company_name);
 CREATE INDEX idx_product_ndc ON shortages_with_ndc(product_ndc);
 
+-- Keyset pagination for the dashboard drill-down: equality column first, then
+-- the page order, so each page is one index range read (also serve plain
+-- company_name / package_ndc lookups and prefix searches)
+CREATE INDEX idx_company_keyset ON shortages_with_ndc(company_name, update_date_dt, shortage_id);
+CREATE INDEX idx_generic_keyset ON shortages_with_ndc(ndc_generic_key, update_date_dt, shortage_id);
+CREATE INDEX idx_package_keyset ON shortages_with_ndc(package_ndc, update_date_dt, shortage_id);
+
+-- Index-backed GROUP BY for the package and route charts
+CREATE INDEX idx_package_type ON shortages_with_ndc(package_type);
+CREATE INDEX idx_route_group ON shortages_with_ndc(route_group);
+CREATE INDEX idx_status_package_type ON shortages_with_ndc(status, package_type);
+CREATE INDEX idx_status_route_group ON shortages_with_ndc(status, route_group);
+
 -- Added indexes for parsed dates
 CREATE INDEX idx_initial_posting_date_dt ON shortages_with_ndc(initial_posting_date_dt);
 CREATE INDEX idx_update_date_dt ON shortages_with_ndc(update_date_dt);
@@ -126,11 +194,16 @@ WHERE status = 'Current';
 
 
 -- ============================================
--- ANALYSIS VIEW 2: Multi-Package Shortage Products
--- Identifies products with shortages affecting multiple packages
+-- Materialized summaries for ANALYSIS VIEWS 2-4
+-- Each aggregate is defined once as a *_source view and stored in a
+-- *_summary table (with refreshed_at). The public views below read the
+-- summary tables, so consumers keep their queries and column names while
+-- the COUNT(DISTINCT ...) work happens once per pipeline run.
+-- scripts/run_transformations.py refreshes the tables on incremental runs.
 -- ============================================
-DROP VIEW IF EXISTS multi_package_shortages;
-CREATE OR REPLACE VIEW multi_package_shortages AS
+
+DROP VIEW IF EXISTS multi_package_shortages_source;
+CREATE OR REPLACE VIEW multi_package_shortages_source AS
 SELECT 
     product_ndc,
     shortage_generic_name AS generic_name,
@@ -141,13 +214,8 @@ WHERE product_ndc IS NOT NULL
 GROUP BY product_ndc, shortage_generic_name, company_name
 HAVING COUNT(DISTINCT package_ndc) > 1;
 
-
--- ============================================
--- ANALYSIS VIEW 3: Manufacturer Risk Assessment
--- Counts affected packages and products per manufacturer
--- ============================================
-DROP VIEW IF EXISTS manufacturer_risk_analysis;
-CREATE OR REPLACE VIEW manufacturer_risk_analysis AS
+DROP VIEW IF EXISTS manufacturer_risk_analysis_source;
+CREATE OR REPLACE VIEW manufacturer_risk_analysis_source AS
 SELECT 
     company_name,
     COUNT(DISTINCT package_ndc) AS affected_packages,
@@ -157,13 +225,8 @@ FROM shortages_with_ndc
 WHERE company_name IS NOT NULL
 GROUP BY company_name;
 
-
--- ============================================
--- ANALYSIS VIEW 4: Current Manufacturer Risk
--- Focus only on currently active shortages by manufacturer
--- ============================================
-DROP VIEW IF EXISTS current_manufacturer_risk;
-CREATE OR REPLACE VIEW current_manufacturer_risk AS
+DROP VIEW IF EXISTS current_manufacturer_risk_source;
+CREATE OR REPLACE VIEW current_manufacturer_risk_source AS
 SELECT 
     company_name,
     COUNT(DISTINCT package_ndc) AS current_affected_packages,
@@ -173,6 +236,75 @@ WHERE status = 'Current'
     AND company_name IS NOT NULL
 GROUP BY company_name;
 
+DROP TABLE IF EXISTS multi_package_shortages_summary;
+CREATE TABLE multi_package_shortages_summary (
+  product_ndc VARCHAR(20),
+  generic_name TEXT,
+  manufacturer VARCHAR(255),
+  affected_packages BIGINT,
+  refreshed_at DATETIME NOT NULL,
+  INDEX idx_product_ndc (product_ndc),
+  INDEX idx_affected_packages (affected_packages)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+DROP TABLE IF EXISTS manufacturer_risk_analysis_summary;
+CREATE TABLE manufacturer_risk_analysis_summary (
+  company_name VARCHAR(255) PRIMARY KEY,
+  affected_packages BIGINT,
+  affected_products BIGINT,
+  current_shortage_packages BIGINT,
+  refreshed_at DATETIME NOT NULL,
+  INDEX idx_affected_packages (affected_packages)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+DROP TABLE IF EXISTS current_manufacturer_risk_summary;
+CREATE TABLE current_manufacturer_risk_summary (
+  company_name VARCHAR(255) PRIMARY KEY,
+  current_affected_packages BIGINT,
+  current_affected_products BIGINT,
+  refreshed_at DATETIME NOT NULL,
+  INDEX idx_current_affected_packages (current_affected_packages)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+INSERT INTO multi_package_shortages_summary
+SELECT src.*, NOW() FROM multi_package_shortages_source src;
+
+INSERT INTO manufacturer_risk_analysis_summary
+SELECT src.*, NOW() FROM manufacturer_risk_analysis_source src;
+
+INSERT INTO current_manufacturer_risk_summary
+SELECT src.*, NOW() FROM current_manufacturer_risk_source src;
+
+
+-- ============================================
+-- ANALYSIS VIEW 2: Multi-Package Shortage Products
+-- Identifies products with shortages affecting multiple packages
+-- ============================================
+DROP VIEW IF EXISTS multi_package_shortages;
+CREATE OR REPLACE VIEW multi_package_shortages AS
+SELECT product_ndc, generic_name, manufacturer, affected_packages
+FROM multi_package_shortages_summary;
+
+
+-- ============================================
+-- ANALYSIS VIEW 3: Manufacturer Risk Assessment
+-- Counts affected packages and products per manufacturer
+-- ============================================
+DROP VIEW IF EXISTS manufacturer_risk_analysis;
+CREATE OR REPLACE VIEW manufacturer_risk_analysis AS
+SELECT company_name, affected_packages, affected_products, current_shortage_packages
+FROM manufacturer_risk_analysis_summary;
+
+
+-- ============================================
+-- ANALYSIS VIEW 4: Current Manufacturer Risk
+-- Focus only on currently active shortages by manufacturer
+-- ============================================
+DROP VIEW IF EXISTS current_manufacturer_risk;
+CREATE OR REPLACE VIEW current_manufacturer_risk AS
+SELECT company_name, current_affected_packages, current_affected_products
+FROM current_manufacturer_risk_summary;
+
 
 -- ============================================
 -- Verification Queries
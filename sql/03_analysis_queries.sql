@@ -12,6 +12,7 @@ USE fda_shortage_db;
 -- Value: Shows manufacturers with most widespread shortage impact
 -- ============================================
 
+-- name: top_manufacturers
 SELECT 
     company_name,
     current_affected_packages,
@@ -25,6 +26,7 @@ LIMIT 10;
 -- Value: Reveals if branded or generic drugs face more shortages
 -- ============================================
 
+-- name: brand_vs_generic
 SELECT 
     CASE 
         WHEN brand_name IS NOT NULL AND brand_name != '' THEN 'Branded Drug'
@@ -46,6 +48,7 @@ ORDER BY shortage_count DESC;
 -- Value: Identifies products with widespread packaging supply issues
 -- ============================================
 
+-- name: multi_package_products
 SELECT 
     generic_name,
     manufacturer,
@@ -60,6 +63,7 @@ LIMIT 15;
 -- Value: Shows if prescription drugs have longer shortage durations than OTC
 -- ============================================
 
+-- name: product_type_duration
 SELECT 
     product_type,
     COUNT(*) AS current_shortages,
@@ -79,20 +83,14 @@ ORDER BY current_shortages DESC;
 -- Value: Reveals which package sizes are most vulnerable to shortages
 -- ============================================
 
+-- name: package_types
 SELECT 
-    CASE 
-        WHEN package_description LIKE '%bottle%' THEN 'Bottle'
-        WHEN package_description LIKE '%vial%' THEN 'Vial'
-        WHEN package_description LIKE '%blister%' THEN 'Blister Pack'
-        WHEN package_description LIKE '%carton%' THEN 'Carton'
-        WHEN package_description LIKE '%kit%' THEN 'Kit'
-        ELSE 'Other/Unknown'
-    END AS package_type,
+    package_type,  -- classified in 02_transformations.sql (classification_rules)
     COUNT(*) AS shortage_count,
     COUNT(DISTINCT company_name) AS manufacturers
 FROM shortages_with_ndc
 WHERE status = 'Current'
-    AND package_description IS NOT NULL
+    AND package_type IS NOT NULL
 GROUP BY package_type
 ORDER BY shortage_count DESC;
 
@@ -102,21 +100,15 @@ ORDER BY shortage_count DESC;
 -- Value: Shows which administration routes are most affected by shortages
 -- ============================================
 
+-- name: route_groups
 SELECT 
-    CASE 
-        WHEN route LIKE '%ORAL%' THEN 'Oral'
-        WHEN route LIKE '%INTRAVENOUS%' OR route LIKE '%IV%' THEN 'Intravenous'
-        WHEN route LIKE '%INJECTION%' THEN 'Injection'
-        WHEN route LIKE '%TOPICAL%' THEN 'Topical'
-        WHEN route LIKE '%INHALATION%' THEN 'Inhalation'
-        ELSE 'Other'
-    END AS administration_route,
+    route_group AS administration_route,  -- classified in 02_transformations.sql
     COUNT(*) AS shortage_count,
     COUNT(DISTINCT product_ndc) AS products_affected
 FROM shortages_with_ndc
 WHERE status = 'Current'
-    AND route IS NOT NULL
-GROUP BY administration_route
+    AND route_group IS NOT NULL
+GROUP BY route_group
 ORDER BY shortage_count DESC;
 
 -- ============================================
@@ -125,6 +117,7 @@ ORDER BY shortage_count DESC;
 -- Value: Shows data quality and join effectiveness
 -- ============================================
 
+-- name: match_rate
 SELECT 
     'Total Shortage Records' AS metric,
     COUNT(*) AS count,
@@ -155,6 +148,7 @@ WHERE product_ndc IS NULL;
 -- Value: Shows if certain approval types (NDA, ANDA, OTC) face more shortages
 -- ============================================
 
+-- name: marketing_categories
 SELECT 
     marketing_category,
     COUNT(*) AS shortage_count,
@@ -172,6 +166,7 @@ ORDER BY shortage_count DESC;
 -- Value: Comprehensive shortage report impossible without join
 -- ============================================
 
+-- name: current_shortage_list
 SELECT 
     company_name AS manufacturer,
     shortage_generic_name AS generic_name,
@@ -196,6 +191,7 @@ LIMIT 50;
 -- Value: Tests if larger manufacturers have proportionally more shortages
 -- ============================================
 
+-- name: portfolio_vs_risk
 SELECT 
     s.company_name,
     COUNT(DISTINCT s.product_ndc) AS products_with_shortages,
@@ -214,4 +210,5 @@ LIMIT 20;
 -- Success Message
 -- ============================================
 
+-- name: analysis_ready
 SELECT 'Analysis queries ready - all showcase join value' AS status;